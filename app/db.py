@@ -1,9 +1,122 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import StaticPool
+from starlette.concurrency import run_in_threadpool
 import os
 
+# Async drivers selectable through DATABASE_URL and their sync counterparts
+ASYNC_TO_SYNC_DRIVERS = {
+    "sqlite+aiosqlite": "sqlite",
+    "postgresql+asyncpg": "postgresql",
+}
+
 DB_URL = os.environ.get("DATABASE_URL", "sqlite:///./app.db")
-connect_args = {"check_same_thread": False} if DB_URL.startswith("sqlite") else {}
-engine = create_engine(DB_URL, echo=False, future=True, connect_args=connect_args)
+
+ASYNC_DB_URL = None
+SYNC_DB_URL = DB_URL
+for async_scheme, sync_scheme in ASYNC_TO_SYNC_DRIVERS.items():
+    if DB_URL.startswith(async_scheme + "://"):
+        ASYNC_DB_URL = DB_URL
+        SYNC_DB_URL = sync_scheme + DB_URL[len(async_scheme):]
+        break
+
+IS_SQLITE = SYNC_DB_URL.startswith("sqlite")
+IS_SQLITE_MEMORY = IS_SQLITE and (SYNC_DB_URL in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in SYNC_DB_URL)
+
+# An in-memory database lives inside a single connection: the sync engine keeps that
+# one connection for every thread (StaticPool), and a second async engine would open
+# its own empty database, so in-memory URLs always run on the sync engine.
+if IS_SQLITE_MEMORY:
+    ASYNC_DB_URL = None
+
+# SQLite profile: applied on every new connection. WAL lets readers run alongside the
+# single writer, busy_timeout makes writers wait for the lock instead of failing with
+# "database is locked", and the cache/mmap sizes keep hot pages in memory.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT", "5000")),
+    "cache_size": int(os.environ.get("SQLITE_CACHE_SIZE", "-65536")),  # negative = KiB (64 MiB)
+    "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "temp_store": os.environ.get("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+
+def engine_options(url: str) -> dict:
+    """Pool/connect settings for the SQLite or Postgres profile."""
+    if url.startswith("sqlite"):
+        if IS_SQLITE_MEMORY:
+            return {"connect_args": {"check_same_thread": False}, "poolclass": StaticPool}
+        return {
+            "connect_args": {"check_same_thread": False, "timeout": SQLITE_PRAGMAS["busy_timeout"] / 1000},
+            "pool_size": int(os.environ.get("DB_POOL_SIZE", "5")),
+            "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "10")),
+            "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", "30")),
+        }
+    return {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": True,
+    }
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            if IS_SQLITE_MEMORY and name in ("journal_mode", "mmap_size"):
+                continue
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+engine = create_engine(SYNC_DB_URL, echo=False, future=True, **engine_options(SYNC_DB_URL))
+if IS_SQLITE:
+    event.listen(engine, "connect", apply_sqlite_pragmas)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+# Request handlers run their queries on the async engine when DATABASE_URL names an
+# async driver (sqlite+aiosqlite://, postgresql+asyncpg://). The sync engine stays
+# available for table creation, scripts and background imports.
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_DB_URL:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    async_options = engine_options(SYNC_DB_URL)
+    if IS_SQLITE:
+        # aiosqlite takes no check_same_thread; it runs each connection on its own thread
+        async_options["connect_args"] = {
+            k: v for k, v in async_options["connect_args"].items() if k != "check_same_thread"
+        }
+        # the aiosqlite dialect defaults to NullPool, which reopens a file per request
+        async_options["poolclass"] = AsyncAdaptedQueuePool
+    async_engine = create_async_engine(ASYNC_DB_URL, echo=False, **async_options)
+    if IS_SQLITE:
+        event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=True)
+
+
+def _run_with_session(fn, *args, **kwargs):
+    db = SessionLocal()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+async def run_db(fn, *args, **kwargs):
+    """Run ``fn(session, *args, **kwargs)`` without blocking the event loop.
+
+    Uses the async engine when one is configured, otherwise a sync session on the
+    threadpool. ``fn`` must return plain data: the session is closed afterwards.
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            return await session.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(_run_with_session, fn, *args, **kwargs)
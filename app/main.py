@@ -1,28 +1,52 @@
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Header, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any, Union
 from dotenv import load_dotenv
 load_dotenv()
-import requests
 import os
 import json
-import requests
+import time
 from dotenv import load_dotenv
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from .services.rerank import get_class_summary
+from .services.rerank import get_class_summary, save_class_players, summary_cache
+from .services.leaderboard import read_leaderboard, refresh_team_snapshot, snapshot_for_team, team_ratings, team_history
+from .services.cache import (
+    response_cache, versioned_key, MISSING, invalidate, invalidate_async, off_loop, scope_version, versions, etag_matches,
+)
+from .services.bulk import (
+    recruit_row, insert_recruits, update_recruits, replace_recruits, insert_rerank_players, replace_rerank_players,
+)
+from .services.upload import detect_format, stream_upload, upload_progress
+from .services import export
+from .services.broker import broker, message_topic
+from .services.pagination import paginate, clamp_limit, ordered
+from .services.queries import (
+    RECRUIT_ORDER, RATING_ORDER, MESSAGE_ORDER, CLASS_ORDER,
+    class_recruits_query, rated_recruits_query, delete_class_recruits, class_meta_query,
+    team_classes_query, class_players_query, delete_class_players, team_messages_query,
+)
+from .services.class_meta import contribution_of, rating_from_note, update_for_recruit, rebuild as rebuild_class_meta
+from .services.auth import CurrentUser, resolve_user, invalidate_user, user_cache
+from .services import auth
+from .services.cfbd import CFBDClient, CFBDError, fetch_class, write_class, bulk_import_year, fetch_year_classes, commit_year
+from .utils.teams import normalize_team_name
 
 # DB and models
-from .db import SessionLocal, engine, Base
+from .db import SessionLocal, engine, Base, run_db
 from . import models
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, select
 
 # Security
-from .services.security import hash_password, verify_password, create_access_token, decode_token
+from .services.security import (
+    hash_password, verify_password, create_access_token,
+    password_pool, PasswordPoolBusy,
+)
 
 # load .env early
 load_dotenv()
@@ -38,6 +62,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 # Outcome mapping
@@ -53,22 +78,24 @@ OUTCOME_POINTS: Dict[str, int] = {
     "NFL Pro Bowl": 8,
 }
 
-# Team name normalization
-def normalize_team_name(name: str) -> str:
-    try:
-        cleaned = str(name or "").strip()
-        # Simple title-case normalization to ensure leading capitals (e.g., 'oklahoma state' -> 'Oklahoma State')
-        return cleaned.title()
-    except Exception:
-        return str(name or "").strip()
+# Conditional GET helpers: ETags come from per-(year, team) versions bumped on writes
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
 
-# Dependency
-def get_db():
-    db = SessionLocal()
+# Keyset pagination helpers: the next page's cursor travels in X-Next-Cursor
+def page_of(db: Session, stmt, key, cursor: Optional[str], limit: int):
     try:
-        yield db
-    finally:
-        db.close()
+        return paginate(db, stmt, key, cursor, clamp_limit(limit))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
 
 @app.get("/")
 async def root():
@@ -76,17 +103,12 @@ async def root():
 
 
 # Auth helpers
-def get_current_user_db(db: Session, authorization: Optional[str]) -> Optional[models.User]:
-    if not authorization or not authorization.lower().startswith("bearer "):
-        return None
-    token = authorization.split(" ", 1)[1]
-    payload = decode_token(token)
-    if not payload:
-        return None
-    user_id = payload.get("sub")
-    if not user_id:
-        return None
-    return db.get(models.User, int(user_id))
+async def run_password_pool(fn, *args):
+    """Run bcrypt off the event loop; a full queue becomes a 503 the client can retry."""
+    try:
+        return await password_pool.run(fn, *args)
+    except PasswordPoolBusy:
+        raise HTTPException(status_code=503, detail="Server busy, retry shortly", headers={"Retry-After": "1"})
 
 class RegisterRequest(BaseModel):
     email: str
@@ -116,8 +138,9 @@ class RecruitOutcomeUpdate(BaseModel):
 
 class RecruitOutcomePayload(BaseModel):
     year: int
-    team: str
+    team: Optional[str] = None  # None accepts updates for any team of the year
     updates: List[RecruitOutcomeUpdate]
+    recalc: bool = False
 
 class AddRecruitPayload(BaseModel):
     year: int
@@ -127,43 +150,76 @@ class AddRecruitPayload(BaseModel):
     stars: int = 0
     rank: int = 0
     outcome: str = ""
+    rating: Optional[float] = None
     note: str = ""
     source: str = "manual"
 
 @app.post("/api/auth/register", response_model=TokenResponse)
-async def register(req: RegisterRequest, db: Session = Depends(get_db)):
-    existing = db.query(models.User).filter(models.User.email == req.email).first()
-    if existing:
+async def register(req: RegisterRequest):
+    def email_taken(db: Session) -> bool:
+        return db.query(models.User.id).filter(models.User.email == req.email).first() is not None
+
+    # Duplicates are rejected before hashing so they never occupy a password pool slot
+    if await run_db(email_taken):
         raise HTTPException(status_code=409, detail="Email already registered")
-    user = models.User(email=req.email, password_hash=hash_password(req.password))
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    token = create_access_token({"sub": str(user.id), "email": user.email, "is_admin": bool(user.is_admin)})
+    password_hash = await run_password_pool(hash_password, req.password)
+
+    def create_user(db: Session) -> Dict[str, Any]:
+        # Re-checked here in case a concurrent registration took the email meanwhile
+        if email_taken(db):
+            raise HTTPException(status_code=409, detail="Email already registered")
+        user = models.User(email=req.email, password_hash=password_hash)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return {"sub": str(user.id), "email": user.email, "is_admin": bool(user.is_admin)}
+
+    token = create_access_token(await run_db(create_user))
     return TokenResponse(access_token=token)
 
 @app.post("/api/auth/login", response_model=TokenResponse)
-async def login(req: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == req.email).first()
-    if not user or not verify_password(req.password, user.password_hash):
+async def login(req: LoginRequest):
+    def find_user(db: Session) -> Optional[Dict[str, Any]]:
+        user = db.query(models.User).filter(models.User.email == req.email).first()
+        if not user:
+            return None
+        return {"id": user.id, "email": user.email, "is_admin": bool(user.is_admin), "password_hash": user.password_hash}
+
+    user = await run_db(find_user)
+    if not user or not await run_password_pool(verify_password, req.password, user["password_hash"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    token = create_access_token({"sub": str(user.id), "email": user.email, "is_admin": bool(user.is_admin)})
+    user_cache.set(CurrentUser(user["id"], user["email"], user["is_admin"]))
+    token = create_access_token({"sub": str(user["id"]), "email": user["email"], "is_admin": user["is_admin"]})
     return TokenResponse(access_token=token)
 
 
 
 @app.get("/api/rerank/{year}/{team}")
-async def rerank_class(year: int, team: str):
+async def rerank_class(
+    year: int,
+    team: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
+):
     team = normalize_team_name(team)
-    summary = get_class_summary(year, team)
-    if not summary.get("players"):
-        raise HTTPException(status_code=404, detail="Class not found")
+    version = await scope_version("rerank", year, team)
+    etag = versions.etag("rerank", year, team, version=version)
+    key = versioned_key("rerank", year, team, version=version)
+    # Resolve the class before the ETag check so a missing class is a 404, not a 304
+    summary = response_cache.get(key)
+    if summary is MISSING:
+        summary = await run_in_threadpool(get_class_summary, year, team)
+        if not summary.get("players"):
+            raise HTTPException(status_code=404, detail="Class not found")
+        response_cache.set(key, summary)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return summary
 
 @app.post("/api/rerank")
 async def save_rerank_class(
     payload: ReRankPayload,
-    db: Session = Depends(get_db),
     authorization: Optional[str] = Header(default=None, alias="Authorization"),
 ):
     try:
@@ -171,8 +227,6 @@ async def save_rerank_class(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid year")
 
-    # Persist to DB
-    user = get_current_user_db(db, authorization)
     players_clean: List[Dict[str, Any]] = []
     total = 0
     for p in payload.players:
@@ -185,78 +239,145 @@ async def save_rerank_class(
         total += points
     avg = round(total / max(1, len(players_clean)), 2)
 
-    rerank = models.RerankClass(
-        year=year, 
-        team=payload.team.strip(), 
-        total_points=total, 
-        avg_points=avg, 
-        created_by=(user.id if user else None)
-    )
-    db.add(rerank)
-    db.commit()
-    db.refresh(rerank)
+    user = await resolve_user(authorization)
 
-    for p in players_clean:
-        db.add(models.RerankPlayer(class_id=rerank.id, name=p["name"], points=p["points"], note=p["note"]))
-    db.commit()
+    # Persist to DB
+    def save(db: Session) -> int:
+        rerank = models.RerankClass(
+            year=year, 
+            team=payload.team.strip(), 
+            total_points=total, 
+            avg_points=avg, 
+            player_count=len(players_clean),
+            created_by=(user.id if user else None)
+        )
+        db.add(rerank)
+        db.flush()
 
-    # Also save to JSON for portability
-    team_slug = payload.team.strip().lower().replace(" ", "_")
-    data_dir = os.path.join(os.path.dirname(__file__), "data", "rerank")
-    os.makedirs(data_dir, exist_ok=True)
-    path = os.path.join(data_dir, f"{year}_{team_slug}.json")
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(players_clean, f, ensure_ascii=False, indent=2)
+        insert_rerank_players(db, rerank.id, players_clean)
+        refresh_team_snapshot(db, year, rerank.team)
+        db.commit()
+        return rerank.id
 
-    return {"ok": True, "saved": len(players_clean), "total_points": total, "avg_points": avg, "class_id": rerank.id}
+    class_id = await run_db(save)
+
+    # Also save to the packed rerank archive for portability
+    await run_in_threadpool(save_class_players, year, payload.team, players_clean)
+    await invalidate_async("rerank", year, payload.team.strip())
+    await invalidate_async("leaderboard", year)
+
+    return {"ok": True, "saved": len(players_clean), "total_points": total, "avg_points": avg, "class_id": class_id}
 
 # Recruits: upload/list and recalc rerank from recruits
 @app.post("/api/recruits/upload")
-async def upload_recruits(payload: RecruitPayload, db: Session = Depends(get_db)):
-    # Upsert simplistic: delete existing year/team then insert
-    db.query(models.Recruit).filter(models.Recruit.year == payload.year, models.Recruit.team == payload.team).delete()
-    count = 0
-    for r in payload.recruits:
-        name = str(r.get("name", "")).strip()
-        if not name:
-            continue
-        rec = models.Recruit(
-            year=int(payload.year),
-            team=payload.team.strip(),
-            name=name,
-            position=str(r.get("position", "")).strip(),
-            stars=int(r.get("stars", 0) or 0),
-            rank=int(r.get("rank", 0) or 0),
-            outcome=str(r.get("outcome", "")).strip(),
-            points=int(r.get("points", 0) or 0),
-            note=str(r.get("note", "")).strip(),
-            source=str(r.get("source", "")).strip(),
-        )
-        db.add(rec)
-        count += 1
-    db.commit()
+async def upload_recruits(payload: RecruitPayload):
+    rows = [recruit_row(payload.year, payload.team.strip(), r) for r in payload.recruits]
+
+    def replace(db: Session) -> int:
+        # Upsert simplistic: delete existing year/team then insert
+        db.execute(delete_class_recruits(payload.year, payload.team))
+        count = insert_recruits(db, [r for r in rows if r["name"]])
+        rebuild_class_meta(db, payload.year, payload.team.strip())
+        db.commit()
+        return count
+
+    count = await run_db(replace)
+    await invalidate_async("recruits", payload.year, payload.team)
+    await invalidate_async("class_meta", payload.year, payload.team)
     return {"ok": True, "saved": count}
 
+@app.post("/api/recruits/upload/stream")
+async def upload_recruits_stream(
+    request: Request,
+    format: Optional[str] = None,
+    upload_id: Optional[str] = None,
+):
+    """Stream NDJSON or CSV recruits (one per line/row, each with year and team).
+
+    Rows are written in batches as they arrive; every (year, team) in the upload
+    replaces that class's existing recruits. Pass ``upload_id`` to poll progress
+    from /api/recruits/upload/stream/{upload_id} while the upload runs.
+    """
+    fmt = detect_format(format, request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Send NDJSON or CSV (format=ndjson|csv or a matching Content-Type)")
+    upload_id = upload_progress.start(upload_id, fmt)
+    groups = set()
+    try:
+        await stream_upload(request.stream(), fmt, upload_id, run_db, groups)
+    except UnicodeDecodeError:
+        upload_progress.update(upload_id, status="failed", finished_at=time.time())
+        raise HTTPException(status_code=400, detail="Upload must be UTF-8 encoded")
+    except Exception:
+        upload_progress.update(upload_id, status="failed", finished_at=time.time())
+        raise
+    finally:
+        for year, team in groups:
+            await invalidate_async("recruits", year, team)
+            await invalidate_async("class_meta", year, team)
+    upload_progress.update(upload_id, status="done", finished_at=time.time())
+    return {"ok": True, **upload_progress.get(upload_id)}
+
+@app.get("/api/recruits/upload/stream/{upload_id}")
+async def upload_recruits_stream_progress(upload_id: str):
+    progress = upload_progress.get(upload_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return progress
+
 @app.get("/api/recruits/{year}/{team}")
-async def list_recruits(year: int, team: str, db: Session = Depends(get_db)):
+async def list_recruits(
+    year: int,
+    team: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+):
+    """Recruits by rank; pass ``limit`` (and then ``cursor`` from X-Next-Cursor) to page."""
     team = normalize_team_name(team)
-    rows = db.query(models.Recruit).filter(models.Recruit.year == year, models.Recruit.team == team).order_by(models.Recruit.rank.asc()).all()
-    return [{
-        "id": r.id,
-        "name": r.name,
-        "position": r.position,
-        "stars": r.stars,
-        "rank": r.rank,
-        "outcome": r.outcome,
-        "points": r.points,
-        "note": r.note,
-        "source": r.source,
-    } for r in rows]
+    version = await scope_version("recruits", year, team)
+    etag = versions.etag("recruits", year, team, version=version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    paged = limit is not None or cursor is not None
+    key = versioned_key("recruits", year, team, version=version)
+    if not paged:
+        cached = response_cache.get(key)
+        if cached is not MISSING:
+            return cached
+
+    def query(db: Session):
+        stmt = class_recruits_query(year, team)
+        next_cursor = None
+        if paged:
+            rows, next_cursor = page_of(db, stmt, RECRUIT_ORDER, cursor, limit or 100)
+        else:
+            rows = db.scalars(ordered(stmt, RECRUIT_ORDER)).all()
+        return [{
+            "id": r.id,
+            "name": r.name,
+            "position": r.position,
+            "stars": r.stars,
+            "rank": r.rank,
+            "outcome": r.outcome,
+            "points": r.points,
+            "rating": r.rating,
+            "note": r.note,
+            "source": r.source,
+        } for r in rows], next_cursor
+
+    result, next_cursor = await run_db(query)
+    if paged:
+        set_next_cursor(response, next_cursor)
+    else:
+        response_cache.set(key, result)
+    return result
 
-@app.post("/api/recruits/recalc/{year}/{team}")
-async def recalc_rerank_from_recruits(year: int, team: str, db: Session = Depends(get_db)):
-    team = normalize_team_name(team)
-    rows = db.query(models.Recruit).filter(models.Recruit.year == year, models.Recruit.team == team).all()
+def recalc_class(db: Session, year: int, team: str) -> Dict[str, Any]:
+    """Rebuild the auto-generated rerank class of a (year, team) from its recruits. Does not commit."""
+    rows = db.scalars(class_recruits_query(year, team)).all()
     if not rows:
         raise HTTPException(status_code=404, detail="No recruits for year/team")
     
@@ -286,11 +407,7 @@ async def recalc_rerank_from_recruits(year: int, team: str, db: Session = Depend
     avg = round(total_points / max(1, len(all_players)), 2)
 
     # Check if there's existing user-created work that should be preserved
-    existing_user_classes = db.query(models.RerankClass).filter(
-        models.RerankClass.year == year, 
-        models.RerankClass.team == team,
-        models.RerankClass.created_by.isnot(None)  # User-created reranks
-    ).all()
+    existing_user_classes = db.scalars(team_classes_query(year, team, user_created=True)).all()
     
     # If there are user-created reranks, throw an error to prevent overwriting
     if existing_user_classes:
@@ -300,267 +417,260 @@ async def recalc_rerank_from_recruits(year: int, team: str, db: Session = Depend
         )
     
     # No user work to preserve, safe to delete old auto-generated classes
-    old_auto_classes = db.query(models.RerankClass).filter(
-        models.RerankClass.year == year, 
-        models.RerankClass.team == team,
-        models.RerankClass.created_by.is_(None)  # Auto-generated classes only
-    ).all()
+    old_auto_classes = db.scalars(team_classes_query(year, team, user_created=False)).all()
     for oc in old_auto_classes:
-        db.query(models.RerankPlayer).filter(models.RerankPlayer.class_id == oc.id).delete()
+        db.execute(delete_class_players(oc.id))
         db.delete(oc)
-    db.commit()
     
     rc = models.RerankClass(
         year=year, 
         team=team, 
         total_points=total_points, 
         avg_points=avg,
+        player_count=len(all_players),
         created_by=None  # Auto-generated
     )
     
     db.add(rc)
-    db.commit()
-    db.refresh(rc)
-    for p in all_players:
-        db.add(models.RerankPlayer(class_id=rc.id, name=p["name"], points=p["points"], note=p["note"]))
-    db.commit()
+    db.flush()
+    insert_rerank_players(db, rc.id, all_players)
+    refresh_team_snapshot(db, year, team)
 
     return {"ok": True, "class_id": rc.id, "total_points": total_points, "avg_points": avg, "players_count": len(all_players), "players_with_outcomes": players_with_outcomes}
 
+@app.post("/api/recruits/recalc/{year}/{team}")
+async def recalc_rerank_from_recruits(year: int, team: str):
+    team = normalize_team_name(team)
+
+    def recalc(db: Session) -> Dict[str, Any]:
+        result = recalc_class(db, year, team)
+        db.commit()
+        return result
+
+    result = await run_db(recalc)
+    await invalidate_async("leaderboard", year)
+    return result
+
 @app.get("/api/leaderboard/rerank/{year}")
-async def rerank_leaderboard(year: int, db: Session = Depends(get_db)):
-    # Define all teams with colors
-    all_teams = [
-        "Alabama", "Arkansas", "Auburn", "Florida", "Georgia", "Kentucky", "LSU", 
-        "Mississippi State", "Missouri", "Ole Miss", "South Carolina", "Tennessee", 
-        "Texas A&M", "Vanderbilt", "Texas", "Oklahoma", "Arizona", "Arizona State", 
-        "Baylor", "BYU", "Cincinnati", "Colorado", "Houston", "Iowa State", "Kansas", 
-        "Kansas State", "Oklahoma State", "TCU", "Texas Tech", "UCF", "Utah", 
-        "West Virginia", "Illinois", "Indiana", "Iowa", "Maryland", "Michigan", 
-        "Michigan State", "Minnesota", "Nebraska", "Northwestern", "Ohio State", 
-        "Penn State", "Purdue", "Rutgers", "Wisconsin", "Oregon", "UCLA", "USC", 
-        "Washington", "Oregon State", "Washington State", "Boston College", 
-        "Clemson", "Duke", "Florida State", "Georgia Tech", "Louisville", "Miami", 
-        "North Carolina", "NC State", "Pittsburgh", "Syracuse", "Virginia", 
-        "Virginia Tech", "Wake Forest", "California", "Stanford", "SMU", 
-        "Notre Dame", "UConn", "UMass", "Army", "Navy", "Air Force"
-    ]
-    
-    # Get teams with rerank data (prefer user-created over auto-generated)
-    classes = db.query(models.RerankClass).filter(models.RerankClass.year == year).order_by(models.RerankClass.created_at.desc()).all()
-    latest_by_team: Dict[str, models.RerankClass] = {}
-    for rc in classes:
-        key = normalize_team_name(rc.team)
-        if key not in latest_by_team:
-            latest_by_team[key] = rc
-        elif rc.created_by is not None and latest_by_team[key].created_by is None:
-            # Prefer user-created over auto-generated
-            latest_by_team[key] = rc
-    
-    # Build rows for all teams
-    rows = []
-    for team_name in all_teams:
-        normalized_team = normalize_team_name(team_name)
-        rc = latest_by_team.get(normalized_team)
-        
-        if rc:
-            # Team has rerank data
-            commits = db.query(models.RerankPlayer).filter(models.RerankPlayer.class_id == rc.id).count()
-            rows.append({
-                "team": normalized_team,
-                "year": rc.year,
-                "class_id": rc.id,
-                "total_points": rc.total_points,
-                "avg_points": rc.avg_points,
-                "commits": commits,
-                "has_rerank": True
-            })
-        else:
-            # Team has no data yet
-            rows.append({
-                "team": normalized_team,
-                "year": year,
-                "class_id": None,
-                "total_points": 0,
-                "avg_points": 0,
-                "commits": 0,
-                "has_rerank": False
-            })
-    
-    # Sort by: 1) Has rerank data (points > 0), 2) Total points (descending), 3) Alphabetical
-    rows.sort(key=lambda r: (
-        not r["has_rerank"],  # Teams with rerank data first
-        -r["total_points"],   # Then by total points (descending)
-        r["team"]             # Then alphabetically
-    ))
-    
-    # Assign ranks
-    for idx, r in enumerate(rows, start=1):
-        r["rank"] = idx
-    
+async def rerank_leaderboard(
+    year: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
+):
+    version = await scope_version("leaderboard", year)
+    etag = versions.etag("leaderboard", year, version=version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    key = versioned_key("leaderboard", year, version=version)
+    cached = response_cache.get(key)
+    if cached is not MISSING:
+        return cached
+    board = await run_db(read_leaderboard, year)
+    response_cache.set(key, board)
+    return board
+
+@app.get("/api/leaderboard/ratings/{year}")
+async def rating_leaderboard(year: int):
+    """Teams ranked by the average composite rating of their recruits"""
+    rows = await run_db(team_ratings, year)
     return {"year": year, "count": len(rows), "rows": rows}
 
+@app.get("/api/leaderboard/recruits/{year}")
+async def top_rated_recruits(
+    year: int,
+    response: Response,
+    team: Optional[str] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+):
+    """Recruits by composite rating, best first; page with ``cursor`` from X-Next-Cursor."""
+    def query(db: Session):
+        stmt = rated_recruits_query(year, normalize_team_name(team) if team is not None else None)
+        rows, next_cursor = page_of(db, stmt, RATING_ORDER, cursor, limit)
+        return [{
+            "id": r.id,
+            "team": r.team,
+            "name": r.name,
+            "position": r.position,
+            "stars": r.stars,
+            "rating": r.rating,
+            "rank": r.rank,
+        } for r in rows], next_cursor
+
+    result, next_cursor = await run_db(query)
+    set_next_cursor(response, next_cursor)
+    return result
+
+@app.get("/api/teams/{team}/history")
+async def team_history_endpoint(
+    team: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
+):
+    """Per-year rerank rank/points and ClassMeta ratings for one team, oldest first"""
+    team = normalize_team_name(team)
+    # One global scope: any year's re-rank can move this team's rank
+    version = await scope_version("team_history")
+    etag = versions.etag("team_history", version=version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    key = versioned_key("team_history", None, None, team, version=version)
+    cached = response_cache.get(key)
+    if cached is not MISSING:
+        return cached
+
+    history = await run_db(team_history, team)
+    response_cache.set(key, history)
+    return history
+
 @app.get("/api/rerank/meta")
-async def rerank_meta(year: int, team: str, db: Session = Depends(get_db)):
+async def rerank_meta(year: int, team: str):
     team = normalize_team_name(team)
-    # latest snapshot for team (prefer user-created)
-    user_created = (
-        db.query(models.RerankClass)
-        .filter(models.RerankClass.year == year, models.RerankClass.team == team, models.RerankClass.created_by.isnot(None))
-        .order_by(models.RerankClass.created_at.desc())
-        .first()
-    )
+
+    def query(db: Session) -> Dict[str, Any]:
+        # Leaderboard teams are served from the materialized snapshot
+        snap = snapshot_for_team(db, year, team)
+        if snap and snap.class_id is not None:
+            return {
+                "year": year,
+                "team": team,
+                "class_id": snap.class_id,
+                "rank": snap.rank,
+                "total_points": snap.total_points,
+                "avg_points": snap.avg_points,
+                "commits": snap.commits,
+            }
+        # latest snapshot for team (prefer user-created)
+        user_created = db.scalars(team_classes_query(year, team, user_created=True)).first()
     
-    if user_created:
-        rc = user_created
-    else:
-        rc = (
-            db.query(models.RerankClass)
-            .filter(models.RerankClass.year == year, models.RerankClass.team == team)
-            .order_by(models.RerankClass.created_at.desc())
-            .first()
-        )
-    if not rc:
-        raise HTTPException(status_code=404, detail="No rerank snapshot for team/year")
-    commits = db.query(models.RerankPlayer).filter(models.RerankPlayer.class_id == rc.id).count()
-    # Compute national rank by comparing against latest snapshots for all teams in that year
-    leaderboard = await rerank_leaderboard(year, db)  # type: ignore
-    rank = None
-    for row in leaderboard["rows"]:
-        if normalize_team_name(row["team"]) == team:
-            rank = row["rank"]
-            break
-    return {
-        "year": year,
-        "team": team,
-        "class_id": rc.id,
-        "rank": rank,
-        "total_points": rc.total_points,
-        "avg_points": rc.avg_points,
-        "commits": commits,
-    }
+        if user_created:
+            rc = user_created
+        else:
+            rc = db.scalars(team_classes_query(year, team)).first()
+        if not rc:
+            raise HTTPException(status_code=404, detail="No rerank snapshot for team/year")
+        # Teams outside the leaderboard have no national rank
+        return {
+            "year": year,
+            "team": team,
+            "class_id": rc.id,
+            "rank": None,
+            "total_points": rc.total_points,
+            "avg_points": rc.avg_points,
+            "commits": rc.player_count,
+        }
+
+    return await run_db(query)
 
 
 
 @app.post("/api/recruits/outcomes")
 async def update_recruit_outcomes(
     payload: RecruitOutcomePayload, 
-    db: Session = Depends(get_db),
     authorization: Optional[str] = Header(default=None, alias="Authorization"),
 ):
-    # Require authentication
-    user = get_current_user_db(db, authorization)
+    """Set outcomes (and their points) for many recruits of a year in one transaction.
+
+    Ids outside ``year`` (and ``team``, when given) are ignored. With ``recalc`` the
+    auto-generated rerank class of every touched team is rebuilt in the same
+    transaction; teams that cannot be rebuilt are reported rather than failing the batch.
+    """
+    user = await resolve_user(authorization)
     if not user:
         raise HTTPException(status_code=401, detail="Authentication required")
-    changed = 0
+
+    outcomes: Dict[int, str] = {}
     for u in payload.updates:
-        row = db.get(models.Recruit, u.id)
-        if not row:
-            continue
-        if row.year != payload.year or row.team != payload.team:
-            continue
-        pts = OUTCOME_POINTS.get(u.outcome.strip(), None)
-        if pts is None:
+        outcome = u.outcome.strip()
+        if outcome not in OUTCOME_POINTS:
             raise HTTPException(status_code=400, detail=f"Unknown outcome: {u.outcome}")
-        row.outcome = u.outcome.strip()
-        row.points = int(pts)
-        changed += 1
-    db.commit()
-    return {"ok": True, "updated": changed}
+        outcomes[u.id] = outcome
+
+    def apply(db: Session) -> Dict[str, Any]:
+        found = db.query(models.Recruit.id, models.Recruit.team).filter(
+            models.Recruit.id.in_(list(outcomes)), models.Recruit.year == payload.year
+        )
+        if payload.team is not None:
+            found = found.filter(models.Recruit.team == payload.team)
+        found = found.all()
+        changed = update_recruits(db, [
+            {"id": rid, "outcome": outcomes[rid], "points": OUTCOME_POINTS[outcomes[rid]]} for rid, _ in found
+        ])
+        teams = sorted({team for _, team in found})
+        result: Dict[str, Any] = {"ok": True, "updated": changed, "teams": teams}
+        if payload.recalc:
+            recalc: Dict[str, Any] = {}
+            for team in teams:
+                try:
+                    recalc[team] = recalc_class(db, payload.year, team)
+                except HTTPException as e:
+                    recalc[team] = {"ok": False, "detail": e.detail}
+            result["recalc"] = recalc
+        db.commit()
+        return result
+
+    result = await run_db(apply) if outcomes else {"ok": True, "updated": 0, "teams": []}
+    for team in result["teams"]:
+        await invalidate_async("recruits", payload.year, team)
+    if payload.recalc and result["teams"]:
+        await invalidate_async("leaderboard", payload.year)
+    return result
 
 @app.post("/api/recruits/add")
 async def add_recruit(
     payload: AddRecruitPayload, 
-    db: Session = Depends(get_db),
     authorization: Optional[str] = Header(default=None, alias="Authorization"),
 ):
-    # Require authentication
-    user = get_current_user_db(db, authorization)
-    if not user:
-        raise HTTPException(status_code=401, detail="Authentication required")
-    
-    # Validate required fields
-    if not payload.name.strip():
-        raise HTTPException(status_code=400, detail="Name is required")
-    
     # Normalize team name
     team = normalize_team_name(payload.team)
+
+    user = await resolve_user(authorization)
+    if not user:
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    def add(db: Session) -> Dict[str, Any]:
+        # Validate required fields
+        if not payload.name.strip():
+            raise HTTPException(status_code=400, detail="Name is required")
     
-    # Check if recruit already exists
-    existing = db.query(models.Recruit).filter(
-        models.Recruit.year == payload.year,
-        models.Recruit.team == team,
-        models.Recruit.name == payload.name.strip()
-    ).first()
-    
-    if existing:
-        raise HTTPException(status_code=409, detail="Recruit already exists")
-    
-    # Calculate points if outcome is provided
-    points = 0
-    if payload.outcome.strip():
-        points = OUTCOME_POINTS.get(payload.outcome.strip(), 0)
-    
-    # Create new recruit
-    recruit = models.Recruit(
-        year=payload.year,
-        team=team,
-        name=payload.name.strip(),
-        position=payload.position.strip(),
-        stars=payload.stars,
-        rank=payload.rank,
-        outcome=payload.outcome.strip(),
-        points=points,
-        note=payload.note.strip(),
-        source=payload.source.strip(),
-    )
+        # Check if recruit already exists
+        existing = db.query(models.Recruit).filter(
+            models.Recruit.year == payload.year,
+            models.Recruit.team == team,
+            models.Recruit.name == payload.name.strip()
+        ).first()
     
-    db.add(recruit)
-    db.commit()
-    db.refresh(recruit)
+        if existing:
+            raise HTTPException(status_code=409, detail="Recruit already exists")
     
-    # Update class meta to reflect the new recruit
-    class_meta = db.query(models.ClassMeta).filter(
-        models.ClassMeta.year == payload.year,
-        models.ClassMeta.team == team
-    ).first()
+        # Calculate points if outcome is provided
+        points = 0
+        if payload.outcome.strip():
+            points = OUTCOME_POINTS.get(payload.outcome.strip(), 0)
     
-    if class_meta:
-        # Recalculate class meta based on all recruits
-        all_recruits = db.query(models.Recruit).filter(
-            models.Recruit.year == payload.year,
-            models.Recruit.team == team
-        ).all()
-        
-        if all_recruits:
-            # Calculate new averages
-            total_stars = sum(r.stars for r in all_recruits if r.stars > 0)
-            stars_count = len([r for r in all_recruits if r.stars > 0])
-            
-            # Safely calculate rating average
-            total_rating = 0
-            rating_count = 0
-            for r in all_recruits:
-                if r.note and 'rating:' in r.note:
-                    try:
-                        rating_part = r.note.split('rating:')[1].strip()
-                        rating_value = float(rating_part)
-                        total_rating += rating_value
-                        rating_count += 1
-                    except (ValueError, IndexError):
-                        continue
-            
-            class_meta.commits = len(all_recruits)
-            if stars_count > 0:
-                class_meta.avg_stars = round(total_stars / stars_count, 3)
-            if rating_count > 0:
-                class_meta.avg_rating = round(total_rating / rating_count, 4)
-            
-            db.commit()
+        # Create new recruit
+        recruit = models.Recruit(
+            year=payload.year,
+            team=team,
+            name=payload.name.strip(),
+            position=payload.position.strip(),
+            stars=payload.stars,
+            rank=payload.rank,
+            outcome=payload.outcome.strip(),
+            points=points,
+            rating=payload.rating if payload.rating is not None else rating_from_note(payload.note),
+            note=payload.note.strip(),
+            source=payload.source.strip(),
+        )
     
-    return {
-        "ok": True, 
-        "recruit": {
+        db.add(recruit)
+        update_for_recruit(db, payload.year, team, None, contribution_of(recruit))
+        db.commit()
+        db.refresh(recruit)
+
+        return {
             "id": recruit.id,
             "name": recruit.name,
             "position": recruit.position,
@@ -568,349 +678,261 @@ async def add_recruit(
             "rank": recruit.rank,
             "outcome": recruit.outcome,
             "points": recruit.points,
+            "rating": recruit.rating,
             "note": recruit.note,
             "source": recruit.source,
         }
+
+    recruit = await run_db(add)
+    await invalidate_async("recruits", payload.year, team)
+    await invalidate_async("class_meta", payload.year, team)
+    
+    return {
+        "ok": True, 
+        "recruit": recruit
     }
 
 @app.delete("/api/recruits/{recruit_id}")
 async def delete_recruit(
     recruit_id: int,
-    db: Session = Depends(get_db),
     authorization: Optional[str] = Header(default=None, alias="Authorization"),
 ):
-    # Require authentication
-    user = get_current_user_db(db, authorization)
+    user = await resolve_user(authorization)
     if not user:
         raise HTTPException(status_code=401, detail="Authentication required")
+
+    def remove(db: Session):
+        # Get the recruit
+        recruit = db.get(models.Recruit, recruit_id)
+        if not recruit:
+            raise HTTPException(status_code=404, detail="Recruit not found")
     
-    # Get the recruit
-    recruit = db.get(models.Recruit, recruit_id)
-    if not recruit:
-        raise HTTPException(status_code=404, detail="Recruit not found")
-    
-    # Only allow deletion of manually added recruits
-    if recruit.source != "manual":
-        raise HTTPException(status_code=403, detail="Can only delete manually added recruits")
-    
-    # Store year and team for updating class meta
-    year = recruit.year
-    team = recruit.team
-    
-    # Delete the recruit
-    db.delete(recruit)
-    db.commit()
+        # Only allow deletion of manually added recruits
+        if recruit.source != "manual":
+            raise HTTPException(status_code=403, detail="Can only delete manually added recruits")
     
-    # Update class meta to reflect the deleted recruit
-    class_meta = db.query(models.ClassMeta).filter(
-        models.ClassMeta.year == year,
-        models.ClassMeta.team == team
-    ).first()
+        # Store year and team for updating class meta
+        year = recruit.year
+        team = recruit.team
     
-    if class_meta:
-        # Recalculate class meta based on remaining recruits
-        all_recruits = db.query(models.Recruit).filter(
-            models.Recruit.year == year,
-            models.Recruit.team == team
-        ).all()
-        
-        if all_recruits:
-            # Calculate new averages
-            total_stars = sum(r.stars for r in all_recruits if r.stars > 0)
-            stars_count = len([r for r in all_recruits if r.stars > 0])
-            
-            # Safely calculate rating average
-            total_rating = 0
-            rating_count = 0
-            for r in all_recruits:
-                if r.note and 'rating:' in r.note:
-                    try:
-                        rating_part = r.note.split('rating:')[1].strip()
-                        rating_value = float(rating_part)
-                        total_rating += rating_value
-                        rating_count += 1
-                    except (ValueError, IndexError):
-                        continue
-            
-            class_meta.commits = len(all_recruits)
-            if stars_count > 0:
-                class_meta.avg_stars = round(total_stars / stars_count, 3)
-            if rating_count > 0:
-                class_meta.avg_rating = round(total_rating / rating_count, 4)
-        else:
-            # No recruits left, reset to defaults
-            class_meta.commits = 0
-            class_meta.avg_stars = 0.0
-            class_meta.avg_rating = 0.0
-        
+        # Delete the recruit and take it out of the class aggregates
+        update_for_recruit(db, year, team, contribution_of(recruit), None)
+        db.delete(recruit)
         db.commit()
+        return year, team
+
+    year, team = await run_db(remove)
+    await invalidate_async("recruits", year, team)
+    await invalidate_async("class_meta", year, team)
     
     return {"ok": True, "message": "Recruit deleted successfully"}
 
-@app.post("/api/import/cfbd/{year}/{team}")
-async def import_cfbd(year: int, team: str, db: Session = Depends(get_db)):
+@app.post("/api/import/cfbd/{year:int}/{team}")
+async def import_cfbd(year: int, team: str):
     team = normalize_team_name(team)
     api_key = os.environ.get("CFBD_API_KEY", "")
     if not api_key:
         raise HTTPException(status_code=400, detail="Missing CFBD_API_KEY env var")
-    url = "https://api.collegefootballdata.com/recruiting/players"
-    params = {"year": year, "team": team}
-    headers = {"Authorization": f"Bearer {api_key}"}
+    client = CFBDClient(api_key)
     try:
-        resp = requests.get(url, params=params, headers=headers, timeout=30)
-        if resp.status_code != 200:
-            raise HTTPException(status_code=resp.status_code, detail=f"CFBD error: {resp.text[:200]}")
-        data = resp.json() or []
+        data = await run_in_threadpool(client.recruiting_players, year, team)
+    except CFBDError as e:
+        raise HTTPException(status_code=e.status_code, detail=f"CFBD error: {e.detail}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"CFBD request failed: {e}")
 
     # Map CFBD fields to Recruit
-    db.query(models.Recruit).filter(models.Recruit.year == year, models.Recruit.team == team).delete()
-    saved = 0
+    rows = []
     for it in data:
         name = str(it.get("athleteName") or it.get("name") or "").strip()
         if not name:
             continue
-        position = str(it.get("position") or "").strip()
-        stars = int((it.get("stars") or 0) or 0)
-        rank = int(it.get("ranking") or it.get("compositeRanking") or it.get("overallRank") or 0)
-        rec = models.Recruit(
-            year=year,
-            team=team,
-            name=name,
-            position=position,
-            stars=stars,
-            rank=rank,
-            outcome="",
-            points=0,
-            note="",
-            source="cfbd",
-        )
-        db.add(rec)
-        saved += 1
-    db.commit()
+        rows.append(recruit_row(year, team, {
+            "name": name,
+            "position": it.get("position"),
+            "stars": it.get("stars"),
+            "rank": it.get("ranking") or it.get("compositeRanking") or it.get("overallRank"),
+            "source": "cfbd",
+        }))
+    def replace(db: Session) -> int:
+        saved = replace_recruits(db, year, team, rows)
+        rebuild_class_meta(db, year, team)
+        db.commit()
+        return saved
+
+    saved = await run_db(replace)
+    await invalidate_async("recruits", year, team)
+    await invalidate_async("class_meta", year, team)
     return {"ok": True, "imported": saved}
 
 @app.post("/api/import/cfbd/class")
-async def import_cfbd_class(year: int, team: str, db: Session = Depends(get_db)):
+async def import_cfbd_class(year: int, team: str):
     team = normalize_team_name(team)
     api_key = os.environ.get("CFBD_API_KEY", "")
     if not api_key:
         raise HTTPException(status_code=400, detail="Missing CFBD_API_KEY env var")
-    headers = {"Authorization": f"Bearer {api_key}"}
+    client = CFBDClient(api_key)
 
-    # Team class metadata
+    # Team class metadata and players, fetched off the event loop
     try:
-        t_resp = requests.get(
-            "https://api.collegefootballdata.com/recruiting/teams",
-            params={"year": year, "team": team}, headers=headers, timeout=30
-        )
-        if t_resp.status_code != 200:
-            raise HTTPException(status_code=t_resp.status_code, detail=f"CFBD teams error: {t_resp.text[:200]}")
-        t_data = (t_resp.json() or [])
-        meta = (t_data[0] if t_data else {})
-        national_rank = int(meta.get("rank", 0) or 0)
-        points = float(meta.get("points", 0.0) or 0.0)
-        avg_rating = float(meta.get("averageRating", 0.0) or 0.0)
-        avg_stars = float(meta.get("averageStars", 0.0) or 0.0)
-        commits = int(meta.get("commits", 0) or 0)
+        items, class_meta = await run_in_threadpool(fetch_class, client, year, team)
+    except CFBDError as e:
+        raise HTTPException(status_code=e.status_code, detail=f"CFBD error: {e.detail}")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"CFBD teams request failed: {e}")
+        raise HTTPException(status_code=500, detail=f"CFBD request failed: {e}")
 
-    # Players
-    try:
-        p_resp = requests.get(
-            "https://api.collegefootballdata.com/recruiting/players",
-            params={"year": year, "team": team}, headers=headers, timeout=30
-        )
-        if p_resp.status_code != 200:
-            raise HTTPException(status_code=p_resp.status_code, detail=f"CFBD players error: {p_resp.text[:200]}")
-        players = (p_resp.json() or [])
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"CFBD players request failed: {e}")
+    def write(db: Session) -> int:
+        saved = write_class(db, year, team, items, class_meta)
+        db.commit()
+        return saved
 
-    items = []
-    ratings: List[float] = []
-    stars_list: List[int] = []
-    for it in players:
-        name = str(it.get("athleteName") or it.get("name") or "").strip()
-        if not name:
-            continue
-        rating = float(it.get("rating") or it.get("compositeRating") or 0.0)
-        provided_rank = int(it.get("ranking") or it.get("compositeRanking") or it.get("overallRank") or 0)
-        position = str(it.get("position") or "").strip()
-        stars = int((it.get("stars") or 0) or 0)
-        items.append({
-            "name": name,
-            "rating": rating,
-            "rank": provided_rank,
-            "position": position,
-            "stars": stars,
-        })
-        if rating > 0:
-            ratings.append(rating)
-        if stars > 0:
-            stars_list.append(stars)
-
-    # Fallbacks if team meta lacked data
-    if commits == 0:
-        commits = len(items)
-    if avg_rating == 0.0 and ratings:
-        avg_rating = round(sum(ratings) / len(ratings), 4)
-    if avg_stars == 0.0 and stars_list:
-        avg_stars = round(sum(stars_list) / len(stars_list), 3)
-
-    # Fill missing individual ranks by rating
-    missing = [x for x in items if not x["rank"]]
-    if missing:
-        sorted_all = sorted(items, key=lambda x: x["rating"], reverse=True)
-        rank_map = {x["name"]: i + 1 for i, x in enumerate(sorted_all)}
-        for x in items:
-            if not x["rank"]:
-                x["rank"] = rank_map.get(x["name"], 0)
-
-    # Upsert recruits
-    db.query(models.Recruit).filter(models.Recruit.year == year, models.Recruit.team == team).delete()
-    saved = 0
-    for x in items:
-        note = f"rating:{x['rating']}"
-        rec = models.Recruit(
-            year=year,
-            team=team,
-            name=x["name"],
-            position=x["position"],
-            stars=x["stars"],
-            rank=x["rank"],
-            outcome="",
-            points=0,
-            note=note,
-            source="cfbd",
-        )
-        db.add(rec)
-        saved += 1
-    db.commit()
-
-    # Upsert class meta
-    existing = db.query(models.ClassMeta).filter(models.ClassMeta.year == year, models.ClassMeta.team == team).first()
-    if existing:
-        existing.national_rank = national_rank
-        existing.points = points
-        existing.avg_rating = avg_rating
-        existing.avg_stars = avg_stars
-        existing.commits = commits
-    else:
-        db.add(models.ClassMeta(
-            year=year, team=team, national_rank=national_rank, points=points,
-            avg_rating=avg_rating, avg_stars=avg_stars, commits=commits
-        ))
-    db.commit()
+    saved = await run_db(write)
+    await invalidate_async("recruits", year, team)
+    await invalidate_async("class_meta", year, team)
 
-    return {"ok": True, "imported": saved, "meta": {
-        "national_rank": national_rank, "points": points, "avg_rating": avg_rating, "avg_stars": avg_stars, "commits": commits
-    }}
+    return {"ok": True, "imported": saved, "meta": class_meta}
 
 @app.post("/api/import/cfbd/all/{year}")
-async def import_cfbd_all(year: int, db: Session = Depends(get_db)):
+async def import_cfbd_all(year: int, mode: str = "teams"):
+    """Import every team for a year.
+
+    mode=teams commits team by team as data arrives (per-team fallback requests for
+    teams missing from the year payload); mode=year writes the whole year in one
+    transaction from two requests.
+    """
+    if mode not in ("teams", "year"):
+        raise HTTPException(status_code=400, detail="mode must be 'teams' or 'year'")
     api_key = os.environ.get("CFBD_API_KEY", "")
     if not api_key:
         raise HTTPException(status_code=400, detail="Missing CFBD_API_KEY env var")
-    headers = {"Authorization": f"Bearer {api_key}"}
+    client = CFBDClient(api_key)
+
+    def on_team(team: str) -> None:
+        invalidate("recruits", year, team)
+        invalidate("class_meta", year, team)
 
-    # Get all teams with recruiting class for the year
     try:
-        t_resp = requests.get(
-            "https://api.collegefootballdata.com/recruiting/teams",
-            params={"year": year}, headers=headers, timeout=30
-        )
-        if t_resp.status_code != 200:
-            raise HTTPException(status_code=t_resp.status_code, detail=f"CFBD teams error: {t_resp.text[:200]}")
-        t_data = (t_resp.json() or [])
-        teams = [normalize_team_name(t.get("team") or t.get("school")) for t in t_data if (t.get("team") or t.get("school"))]
+        if mode == "year":
+            classes, result = await run_in_threadpool(fetch_year_classes, client, year)
+            result["recruits"] = await run_db(commit_year, year, classes)
+            for team in classes:
+                await off_loop(on_team, team)
+        else:
+            result = await run_in_threadpool(
+                bulk_import_year, year, client, SessionLocal,
+                workers=int(os.environ.get("CFBD_IMPORT_WORKERS", "4")), on_team=on_team,
+            )
+    except CFBDError as e:
+        raise HTTPException(status_code=e.status_code, detail=f"CFBD error: {e.detail}")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"CFBD teams request failed: {e}")
-
-    imported = 0
-    errors: Dict[str, str] = {}
-    # Run sequentially to avoid rate limiting; switch to small thread pool if desired
-    for team in teams:
-        try:
-            _ = await import_cfbd_class(year, str(team), db)  # type: ignore
-            imported += 1
-        except Exception as e:  # noqa: BLE001
-            errors[str(team)] = str(e)
+        raise HTTPException(status_code=500, detail=f"CFBD request failed: {e}")
 
-    return {"ok": True, "year": year, "teams": len(teams), "imported": imported, "errors": errors}
+    return {"ok": True, "year": year, **result}
 
 @app.get("/api/class/meta")
-async def get_class_meta(year: int, team: str, db: Session = Depends(get_db)):
+async def get_class_meta(
+    year: int,
+    team: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
+):
     team = normalize_team_name(team)
-    cm = db.query(models.ClassMeta).filter(models.ClassMeta.year == year, models.ClassMeta.team == team).first()
-    if not cm:
-        raise HTTPException(status_code=404, detail="Class metadata not found")
-    return {
-        "year": cm.year,
-        "team": cm.team,
-        "national_rank": cm.national_rank,
-        "points": cm.points,
-        "avg_rating": cm.avg_rating,
-        "avg_stars": cm.avg_stars,
-        "commits": cm.commits,
-    }
+    version = await scope_version("class_meta", year, team)
+    etag = versions.etag("class_meta", year, team, version=version)
+    key = versioned_key("class_meta", year, team, version=version)
+    cached = response_cache.get(key)
+    if cached is not MISSING:
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        return cached
+
+    def query(db: Session) -> Dict[str, Any]:
+        cm = db.scalars(class_meta_query(year, team)).first()
+        if not cm:
+            raise HTTPException(status_code=404, detail="Class metadata not found")
+        return {
+            "year": cm.year,
+            "team": cm.team,
+            "national_rank": cm.national_rank,
+            "points": cm.points,
+            "avg_rating": cm.avg_rating,
+            "avg_stars": cm.avg_stars,
+            "commits": cm.commits,
+        }
+
+    # Looked up before the ETag check so a missing class is a 404, not a 304
+    result = await run_db(query)
+    response_cache.set(key, result)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return result
 
 @app.post("/api/find")
-async def find_and_build(year: int, team: str, db: Session = Depends(get_db)):
+async def find_and_build(year: int, team: str):
     team = normalize_team_name(team)
-    _ = await import_cfbd_class(year, team, db)  # type: ignore
-    _ = await recalc_rerank_from_recruits(year, team, db)  # type: ignore
+    _ = await import_cfbd_class(year, team)
+    _ = await recalc_rerank_from_recruits(year, team)
     return {"ok": True, "message": "Imported (teams+players) and recalculated"}
 
 @app.get("/api/rerank/protection-status/{year}/{team}")
-async def get_protection_status(year: int, team: str, db: Session = Depends(get_db)):
+async def get_protection_status(year: int, team: str):
     """Check if there are user-created reranks that would be protected"""
     team = normalize_team_name(team)
-    user_classes = db.query(models.RerankClass).filter(
-        models.RerankClass.year == year,
-        models.RerankClass.team == team,
-        models.RerankClass.created_by.isnot(None)
-    ).all()
-    
-    return {
-        "year": year,
-        "team": team,
-        "has_user_reranks": len(user_classes) > 0,
-        "user_rerank_count": len(user_classes),
-        "latest_user_rerank": user_classes[0].created_at.isoformat() if user_classes else None
-    }
+
+    def query(db: Session) -> Dict[str, Any]:
+        user_classes = db.scalars(team_classes_query(year, team, user_created=True)).all()
+        
+        return {
+            "year": year,
+            "team": team,
+            "has_user_reranks": len(user_classes) > 0,
+            "user_rerank_count": len(user_classes),
+            "latest_user_rerank": user_classes[0].created_at.isoformat() if user_classes else None
+        }
+
+    return await run_db(query)
 
 # Admin endpoints (MVP: no strict RBAC; if token present, allow manage own; otherwise allow read-only)
 @app.get("/api/admin/classes")
-async def list_classes(db: Session = Depends(get_db)):
-    rows = db.query(models.RerankClass).order_by(models.RerankClass.year.desc()).limit(200).all()
-    return [{
-        "id": r.id,
-        "year": r.year,
-        "team": r.team,
-        "total_points": r.total_points,
-        "avg_points": r.avg_points,
-        "created_at": r.created_at.isoformat(),
-        "created_by": r.created_by,
-    } for r in rows]
+async def list_classes(response: Response, limit: int = 200, cursor: Optional[str] = None):
+    def query(db: Session):
+        rows, next_cursor = page_of(db, select(models.RerankClass), CLASS_ORDER, cursor, limit)
+        return [{
+            "id": r.id,
+            "year": r.year,
+            "team": r.team,
+            "total_points": r.total_points,
+            "avg_points": r.avg_points,
+            "player_count": r.player_count,
+            "created_at": r.created_at.isoformat(),
+            "created_by": r.created_by,
+        } for r in rows], next_cursor
+
+    result, next_cursor = await run_db(query)
+    set_next_cursor(response, next_cursor)
+    return result
 
 @app.get("/api/admin/classes/{class_id}")
-async def get_class(class_id: int, db: Session = Depends(get_db)):
-    rc = db.get(models.RerankClass, class_id)
-    if not rc:
-        raise HTTPException(status_code=404, detail="Not found")
-    players = db.query(models.RerankPlayer).filter(models.RerankPlayer.class_id == class_id).all()
-    return {
-        "id": rc.id,
-        "year": rc.year,
-        "team": rc.team,
-        "total_points": rc.total_points,
-        "avg_points": rc.avg_points,
-        "created_by": rc.created_by,
-        "players": [{"id": p.id, "name": p.name, "points": p.points, "note": p.note} for p in players],
-    }
+async def get_class(class_id: int):
+    def query(db: Session) -> Dict[str, Any]:
+        rc = db.get(models.RerankClass, class_id)
+        if not rc:
+            raise HTTPException(status_code=404, detail="Not found")
+        players = db.scalars(class_players_query(class_id)).all()
+        return {
+            "id": rc.id,
+            "year": rc.year,
+            "team": rc.team,
+            "total_points": rc.total_points,
+            "avg_points": rc.avg_points,
+            "player_count": rc.player_count,
+            "created_by": rc.created_by,
+            "players": [{"id": p.id, "name": p.name, "points": p.points, "note": p.note} for p in players],
+        }
+
+    return await run_db(query)
 
 class UpdateClassPayload(BaseModel):
     team: Optional[str] = None
@@ -918,39 +940,57 @@ class UpdateClassPayload(BaseModel):
     players: Optional[List[Dict[str, Any]]] = None
 
 @app.put("/api/admin/classes/{class_id}")
-async def update_class(class_id: int, payload: UpdateClassPayload, db: Session = Depends(get_db)):
-    rc = db.get(models.RerankClass, class_id)
-    if not rc:
-        raise HTTPException(status_code=404, detail="Not found")
-    if payload.team is not None:
-        rc.team = payload.team
-    if payload.year is not None:
-        rc.year = int(payload.year)
-    if payload.players is not None:
-        # replace players
-        db.query(models.RerankPlayer).filter(models.RerankPlayer.class_id == class_id).delete()
-        total = 0
-        for p in payload.players:
-            name = str(p.get("name", "")).strip()
-            if not name:
-                continue
-            points = int(p.get("points", 0))
-            note = str(p.get("note", "")).strip()
-            total += points
-            db.add(models.RerankPlayer(class_id=class_id, name=name, points=points, note=note))
-        rc.total_points = total
-        rc.avg_points = round(total / max(1, len(payload.players)), 2) if payload.players else 0
-    db.commit()
+async def update_class(class_id: int, payload: UpdateClassPayload):
+    def update(db: Session):
+        rc = db.get(models.RerankClass, class_id)
+        if not rc:
+            raise HTTPException(status_code=404, detail="Not found")
+        old_year, old_team = rc.year, rc.team
+        if payload.team is not None:
+            rc.team = payload.team
+        if payload.year is not None:
+            rc.year = int(payload.year)
+        if payload.players is not None:
+            # replace players
+            players_clean: List[Dict[str, Any]] = []
+            total = 0
+            for p in payload.players:
+                name = str(p.get("name", "")).strip()
+                if not name:
+                    continue
+                points = int(p.get("points", 0))
+                note = str(p.get("note", "")).strip()
+                total += points
+                players_clean.append({"name": name, "points": points, "note": note})
+            rc.player_count = replace_rerank_players(db, class_id, players_clean)
+            rc.total_points = total
+            rc.avg_points = round(total / max(1, len(payload.players)), 2) if payload.players else 0
+        refresh_team_snapshot(db, rc.year, rc.team)
+        if (old_year, normalize_team_name(old_team)) != (rc.year, normalize_team_name(rc.team)):
+            refresh_team_snapshot(db, old_year, old_team)
+        db.commit()
+        return rc.year, old_year
+
+    year, old_year = await run_db(update)
+    await invalidate_async("leaderboard", year)
+    await invalidate_async("leaderboard", old_year)
     return {"ok": True}
 
 @app.delete("/api/admin/classes/{class_id}")
-async def delete_class(class_id: int, db: Session = Depends(get_db)):
-    rc = db.get(models.RerankClass, class_id)
-    if not rc:
-        raise HTTPException(status_code=404, detail="Not found")
-    db.query(models.RerankPlayer).filter(models.RerankPlayer.class_id == class_id).delete()
-    db.delete(rc)
-    db.commit()
+async def delete_class(class_id: int):
+    def remove(db: Session) -> int:
+        rc = db.get(models.RerankClass, class_id)
+        if not rc:
+            raise HTTPException(status_code=404, detail="Not found")
+        year, team = rc.year, rc.team
+        db.execute(delete_class_players(class_id))
+        db.delete(rc)
+        refresh_team_snapshot(db, year, team)
+        db.commit()
+        return year
+
+    year = await run_db(remove)
+    await invalidate_async("leaderboard", year)
     return {"ok": True}
 
 @app.get("/api/import/cfbd/status")
@@ -959,28 +999,69 @@ async def cfbd_status():
     if not api_key:
         return {"ok": False, "has_key": False, "reachable": False, "detail": "CFBD_API_KEY missing"}
     try:
-        url = "https://api.collegefootballdata.com/recruiting/players"
-        params = {"year": 2002, "team": "Oklahoma State"}
-        headers = {"Authorization": f"Bearer {api_key}"}
-        resp = requests.get(url, params=params, headers=headers, timeout=10)
-        reachable = resp.status_code == 200
-        return {"ok": reachable, "has_key": True, "reachable": reachable, "status": resp.status_code}
+        # Bypass the response cache: a cached class would report "reachable" forever
+        client = CFBDClient(api_key, timeout=10, cache=None, offline=False)
+        await run_in_threadpool(client.recruiting_players, 2002, "Oklahoma State")
+        return {"ok": True, "has_key": True, "reachable": True, "status": 200}
+    except CFBDError as e:
+        return {"ok": False, "has_key": True, "reachable": False, "status": e.status_code}
     except Exception as e:
         return {"ok": False, "has_key": True, "reachable": False, "detail": str(e)}
 
+# Streaming exports (NDJSON or CSV) for analytics jobs
+def export_response(fmt: str, name: str, records, fields: List[str]) -> StreamingResponse:
+    if fmt not in export.MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    return StreamingResponse(
+        export.encode(records, fmt, fields),
+        media_type=export.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+@app.get("/api/export/recruits")
+async def export_recruits(format: str = "ndjson", year: Optional[int] = None, team: Optional[str] = None):
+    records = export.with_session(SessionLocal, lambda db: export.recruits(db, year, team))
+    return export_response(format, "recruits", records, export.RECRUIT_FIELDS)
+
+@app.get("/api/export/classes")
+async def export_classes(format: str = "ndjson", year: Optional[int] = None):
+    """Rerank classes with players: nested per class as NDJSON, one row per player as CSV."""
+    flat = format == "csv"
+    records = export.with_session(SessionLocal, lambda db: export.classes(db, year, flat=flat))
+    return export_response(format, "classes", records, export.CLASS_FIELDS + export.PLAYER_FIELDS)
+
+@app.get("/api/export/leaderboard")
+async def export_leaderboard(format: str = "ndjson", year: Optional[int] = None):
+    records = export.with_session(SessionLocal, lambda db: export.leaderboards(db, year))
+    return export_response(format, "leaderboard", records, export.LEADERBOARD_FIELDS)
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Cache counters for sizing RESPONSE_CACHE_SIZE / RESPONSE_CACHE_TTL / RERANK_SUMMARY_CACHE_SIZE,
+    plus password pool counters for PASSWORD_HASH_WORKERS / PASSWORD_HASH_MAX_PENDING
+    and auth caches for AUTH_TOKEN_CACHE_SIZE / AUTH_USER_CACHE_SIZE / AUTH_USER_CACHE_TTL"""
+    return {
+        **response_cache.stats(),
+        "rerank_summaries": summary_cache.stats(),
+        "broker": broker.stats(),
+        "password_hashing": password_pool.stats(),
+        "auth": auth.stats(),
+    }
+
 # Temporary endpoint to promote user to admin (for setup only)
 @app.post("/api/admin/promote-user")
-async def promote_user_to_admin(
-    email: str,
-    db: Session = Depends(get_db)
-):
+async def promote_user_to_admin(email: str):
     """Temporary endpoint to promote a user to admin - for setup only"""
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    user.is_admin = True
-    db.commit()
+    def promote(db: Session) -> int:
+        user = db.query(models.User).filter(models.User.email == email).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        user.is_admin = True
+        db.commit()
+        return user.id
+
+    await off_loop(invalidate_user, await run_db(promote))
     
     return {"ok": True, "message": f"User {email} promoted to admin"}
 
@@ -998,45 +1079,111 @@ class MessageResponse(BaseModel):
     created_at: str
 
 @app.get("/api/messages/{year}/{team}")
-async def get_messages(year: int, team: str, db: Session = Depends(get_db)):
-    """Get all messages for a specific team and year"""
-    messages = db.query(models.Message).filter(
-        models.Message.year == year,
-        models.Message.team == team
-    ).order_by(models.Message.created_at.desc()).all()
-    
-    return [{
-        "id": m.id,
-        "year": m.year,
-        "team": m.team,
-        "user_email": m.user_email,
-        "content": m.content,
-        "created_at": m.created_at.isoformat()
-    } for m in messages]
+async def get_messages(
+    year: int,
+    team: str,
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+):
+    """Get messages for a specific team and year, newest first.
+
+    Pass ``limit`` (and then ``cursor`` from X-Next-Cursor) to page through them.
+    """
+    paged = limit is not None or cursor is not None
+    # Messages are stored under the team name as posted, so keep it in the key
+    key = versioned_key("messages", year, team, team, version=await scope_version("messages", year, team))
+    if not paged:
+        cached = response_cache.get(key)
+        if cached is not MISSING:
+            return cached
+
+    def query(db: Session):
+        stmt = team_messages_query(year, team)
+        next_cursor = None
+        if paged:
+            messages, next_cursor = page_of(db, stmt, MESSAGE_ORDER, cursor, limit or 50)
+        else:
+            messages = db.scalars(ordered(stmt, MESSAGE_ORDER)).all()
+        
+        return [{
+            "id": m.id,
+            "year": m.year,
+            "team": m.team,
+            "user_email": m.user_email,
+            "content": m.content,
+            "created_at": m.created_at.isoformat()
+        } for m in messages], next_cursor
+
+    result, next_cursor = await run_db(query)
+    if paged:
+        set_next_cursor(response, next_cursor)
+    else:
+        response_cache.set(key, result)
+    return result
 
 @app.get("/api/admin/messages")
 async def admin_get_messages(
+    response: Response,
     authorization: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
+    limit: int = 100,
+    cursor: Optional[str] = None,
 ):
-    """Admin endpoint to get all messages across all teams"""
-    current_user = get_current_user_db(db, authorization)
+    """Admin endpoint to get all messages across all teams, newest first, paged by cursor"""
+    current_user = await resolve_user(authorization)
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
-    
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin access required")
-    
-    messages = db.query(models.Message).order_by(models.Message.created_at.desc()).limit(100).all()
-    
-    return [{
-        "id": m.id,
-        "year": m.year,
-        "team": m.team,
-        "user_email": m.user_email,
-        "content": m.content,
-        "created_at": m.created_at.isoformat()
-    } for m in messages]
+
+    def query(db: Session):
+        messages, next_cursor = page_of(db, select(models.Message), MESSAGE_ORDER, cursor, limit)
+        
+        return [{
+            "id": m.id,
+            "year": m.year,
+            "team": m.team,
+            "user_email": m.user_email,
+            "content": m.content,
+            "created_at": m.created_at.isoformat()
+        } for m in messages], next_cursor
+
+    result, next_cursor = await run_db(query)
+    set_next_cursor(response, next_cursor)
+    return result
+
+SSE_HEARTBEAT_SECONDS = float(os.environ.get("SSE_HEARTBEAT_SECONDS", "15"))
+
+@app.get("/api/messages/{year}/{team}/stream")
+async def stream_messages(year: int, team: str):
+    """Server-Sent Events push of a team board's changes.
+
+    Emits ``created`` (with the message) and ``deleted`` (with its id) events, plus a
+    heartbeat comment when idle. A ``resync`` event means events were dropped because the
+    client fell behind: refetch /api/messages/{year}/{team} and reconnect.
+    """
+    sub = broker.subscribe(message_topic(year, team))
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                event = await sub.get(SSE_HEARTBEAT_SECONDS)
+                if sub.overflowed:
+                    yield "event: resync\ndata: {}\n\n"
+                    return
+                if event is None:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            broker.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.post("/api/messages/{year}/{team}")
 async def create_message(
@@ -1044,80 +1191,97 @@ async def create_message(
     team: str, 
     message: MessageRequest, 
     authorization: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
 ):
     """Create a new message for a team"""
-    current_user = get_current_user_db(db, authorization)
-    
-    # For now, allow anonymous messages but prefer authenticated users
-    user_email = current_user.email if current_user else "Anonymous"
-    user_id = current_user.id if current_user else None
-    
-    new_message = models.Message(
-        year=year,
-        team=team,
-        user_id=user_id,
-        user_email=user_email,
-        content=message.content
-    )
-    
-    db.add(new_message)
-    db.commit()
-    db.refresh(new_message)
-    
-    return {
-        "id": new_message.id,
-        "year": new_message.year,
-        "team": new_message.team,
-        "user_email": new_message.user_email,
-        "content": new_message.content,
-        "created_at": new_message.created_at.isoformat()
-    }
+    current_user = await resolve_user(authorization)
+
+    def create(db: Session) -> Dict[str, Any]:
+        # For now, allow anonymous messages but prefer authenticated users
+        user_email = current_user.email if current_user else "Anonymous"
+        user_id = current_user.id if current_user else None
+        
+        new_message = models.Message(
+            year=year,
+            team=team,
+            user_id=user_id,
+            user_email=user_email,
+            content=message.content
+        )
+        
+        db.add(new_message)
+        db.commit()
+        db.refresh(new_message)
+        
+        return {
+            "id": new_message.id,
+            "year": new_message.year,
+            "team": new_message.team,
+            "user_email": new_message.user_email,
+            "content": new_message.content,
+            "created_at": new_message.created_at.isoformat()
+        }
+
+    result = await run_db(create)
+    await invalidate_async("messages", year, team)
+    broker.publish(message_topic(year, team), {"type": "created", "message": result})
+    return result
 
 @app.delete("/api/messages/{message_id}")
 async def delete_message(
     message_id: int,
     authorization: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
 ):
     """Delete a message (only by the author or admin)"""
-    current_user = get_current_user_db(db, authorization)
+    current_user = await resolve_user(authorization)
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
-    
-    message = db.get(models.Message, message_id)
-    if not message:
-        raise HTTPException(status_code=404, detail="Message not found")
-    
-    # Allow deletion if user is the author OR if user is admin
-    if message.user_id != current_user.id and not current_user.is_admin:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this message")
-    
-    db.delete(message)
-    db.commit()
+
+    def remove(db: Session):
+        message = db.get(models.Message, message_id)
+        if not message:
+            raise HTTPException(status_code=404, detail="Message not found")
+        
+        # Allow deletion if user is the author OR if user is admin
+        if message.user_id != current_user.id and not current_user.is_admin:
+            raise HTTPException(status_code=403, detail="Not authorized to delete this message")
+        
+        year, team = message.year, message.team
+        db.delete(message)
+        db.commit()
+        return year, team
+
+    year, team = await run_db(remove)
+    await invalidate_async("messages", year, team)
+    broker.publish(message_topic(year, team), {"type": "deleted", "id": message_id})
     return {"ok": True}
 
 @app.delete("/api/admin/messages/{message_id}")
 async def admin_delete_message(
     message_id: int,
     authorization: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
 ):
     """Admin endpoint to delete any message"""
-    current_user = get_current_user_db(db, authorization)
+    current_user = await resolve_user(authorization)
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
-    
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin access required")
-    
-    message = db.get(models.Message, message_id)
-    if not message:
-        raise HTTPException(status_code=404, detail="Message not found")
-    
-    db.delete(message)
-    db.commit()
-    return {"ok": True, "deleted_by": current_user.email}
+
+    def remove(db: Session):
+        message = db.get(models.Message, message_id)
+        if not message:
+            raise HTTPException(status_code=404, detail="Message not found")
+        
+        year, team = message.year, message.team
+        admin_email = current_user.email
+        db.delete(message)
+        db.commit()
+        return year, team, admin_email
+
+    year, team, admin_email = await run_db(remove)
+    await invalidate_async("messages", year, team)
+    broker.publish(message_topic(year, team), {"type": "deleted", "id": message_id})
+    return {"ok": True, "deleted_by": admin_email}
 
 # Static dashboard
 static_dir = os.path.join(os.path.dirname(__file__), "static")
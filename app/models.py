@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, String, DateTime, ForeignKey, JSON, Text, Float
+from sqlalchemy import Integer, String, DateTime, ForeignKey, JSON, Text, Float, Index
 from datetime import datetime
 from typing import Optional
 from .db import Base
@@ -14,6 +14,10 @@ class User(Base):
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_year_team_created_at", "year", "team", "created_at"),
+        Index("ix_messages_created_at", "created_at"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     year: Mapped[int] = mapped_column(Integer, index=True)
     team: Mapped[str] = mapped_column(String(255), index=True)
@@ -24,24 +28,32 @@ class Message(Base):
 
 class RerankClass(Base):
     __tablename__ = "rerank_classes"
+    __table_args__ = (
+        Index("ix_rerank_classes_year_team_created_at", "year", "team", "created_at"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     year: Mapped[int] = mapped_column(Integer, index=True)
     team: Mapped[str] = mapped_column(String(255), index=True)
     total_points: Mapped[int] = mapped_column(Integer, default=0)
     avg_points: Mapped[float] = mapped_column(Integer, default=0)
+    player_count: Mapped[int] = mapped_column(Integer, default=0)  # kept in sync with rerank_players on write
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     created_by: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"), nullable=True)
 
 class RerankPlayer(Base):
     __tablename__ = "rerank_players"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    class_id: Mapped[int] = mapped_column(Integer, ForeignKey("rerank_classes.id", ondelete="CASCADE"))
+    class_id: Mapped[int] = mapped_column(Integer, ForeignKey("rerank_classes.id", ondelete="CASCADE"), index=True)
     name: Mapped[str] = mapped_column(String(255), index=True)
     points: Mapped[int] = mapped_column(Integer, default=0)
     note: Mapped[str] = mapped_column(Text, default="")
 
 class Recruit(Base):
     __tablename__ = "recruits"
+    __table_args__ = (
+        Index("ix_recruits_year_team_rank", "year", "team", "rank"),
+        Index("ix_recruits_year_rating", "year", "rating"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     year: Mapped[int] = mapped_column(Integer, index=True)
     team: Mapped[str] = mapped_column(String(255), index=True)
@@ -51,12 +63,16 @@ class Recruit(Base):
     rank: Mapped[int] = mapped_column(Integer, default=0)
     outcome: Mapped[str] = mapped_column(String(255), default="")
     points: Mapped[int] = mapped_column(Integer, default=0)
+    rating: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # composite rating, None if unknown
     note: Mapped[str] = mapped_column(Text, default="")
     source: Mapped[str] = mapped_column(String(255), default="")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
 class ClassMeta(Base):
     __tablename__ = "class_meta"
+    __table_args__ = (
+        Index("ix_class_meta_year_team", "year", "team"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     year: Mapped[int] = mapped_column(Integer, index=True)
     team: Mapped[str] = mapped_column(String(255), index=True)
@@ -65,5 +81,27 @@ class ClassMeta(Base):
     avg_rating: Mapped[float] = mapped_column(Float, default=0.0)
     avg_stars: Mapped[float] = mapped_column(Float, default=0.0)
     commits: Mapped[int] = mapped_column(Integer, default=0)
+    # Running aggregates over the class's recruits (positive values only), see services/class_meta.py
+    stars_sum: Mapped[int] = mapped_column(Integer, default=0)
+    stars_count: Mapped[int] = mapped_column(Integer, default=0)
+    rating_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    rating_count: Mapped[int] = mapped_column(Integer, default=0)
     source: Mapped[str] = mapped_column(String(64), default="cfbd")
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+class LeaderboardSnapshot(Base):
+    __tablename__ = "leaderboard_snapshot"
+    __table_args__ = (
+        Index("ix_leaderboard_snapshot_year_team", "year", "team", unique=True),
+        Index("ix_leaderboard_snapshot_year_rank", "year", "rank"),
+        Index("ix_leaderboard_snapshot_team_year", "team", "year"),
+    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    year: Mapped[int] = mapped_column(Integer, nullable=False)
+    team: Mapped[str] = mapped_column(String(255), nullable=False)
+    class_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("rerank_classes.id", ondelete="SET NULL"), nullable=True)
+    total_points: Mapped[int] = mapped_column(Integer, default=0)
+    avg_points: Mapped[float] = mapped_column(Float, default=0.0)
+    commits: Mapped[int] = mapped_column(Integer, default=0)
+    rank: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
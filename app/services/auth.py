@@ -0,0 +1,162 @@
+from typing import Any, Dict, NamedTuple, Optional
+from collections import OrderedDict
+import os
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..db import run_db
+from .security import decode_token
+from .shared_state import shared_state
+
+# Authenticated requests resolve identity without a DB round trip on the hot path:
+# decoded tokens are cached until they expire, and user rows sit in a short TTL cache
+# that write paths changing a user (e.g. promotion to admin) invalidate explicitly.
+
+AUTH_TOKEN_CACHE_SIZE = int(os.environ.get("AUTH_TOKEN_CACHE_SIZE", "4096"))
+AUTH_USER_CACHE_SIZE = int(os.environ.get("AUTH_USER_CACHE_SIZE", "1024"))
+AUTH_USER_CACHE_TTL = float(os.environ.get("AUTH_USER_CACHE_TTL", "60"))
+
+
+class CurrentUser(NamedTuple):
+    id: int
+    email: str
+    is_admin: bool
+
+
+class TokenCache:
+    """Verified token payloads, keyed by the token string and kept until its ``exp``."""
+
+    def __init__(self, maxsize: int = AUTH_TOKEN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def decode(self, token: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(token)
+            if entry is not None:
+                if entry[0] > now:
+                    self._data.move_to_end(token)
+                    self.hits += 1
+                    return entry[1]
+                del self._data[token]
+            self.misses += 1
+        payload = decode_token(token)
+        if not payload or self.maxsize <= 0:
+            return payload
+        with self._lock:
+            self._data[token] = (float(payload.get("exp", now)), payload)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return payload
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+class UserCache:
+    """Thread-safe LRU of ``CurrentUser`` by id with a per-entry TTL."""
+
+    def __init__(self, maxsize: int = AUTH_USER_CACHE_SIZE, ttl: float = AUTH_USER_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[int, tuple[float, CurrentUser]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int) -> Optional[CurrentUser]:
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is None or entry[0] <= time.monotonic():
+                self._data.pop(user_id, None)
+                self.misses += 1
+                return None
+            self._data.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, user: CurrentUser) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[user.id] = (time.monotonic() + self.ttl, user)
+            self._data.move_to_end(user.id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Drop one user, or every user when ``user_id`` is None."""
+        with self._lock:
+            if user_id is None:
+                self.invalidations += len(self._data)
+                self._data.clear()
+            elif self._data.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+token_cache = TokenCache()
+user_cache = UserCache()
+
+
+def load_user(db: Session, user_id: int) -> Optional[CurrentUser]:
+    user = db.get(models.User, user_id)
+    if not user:
+        return None
+    return CurrentUser(user.id, user.email, bool(user.is_admin))
+
+
+async def resolve_user(authorization: Optional[str]) -> Optional[CurrentUser]:
+    """Resolve a ``Bearer`` Authorization header to the user, or None if absent/invalid."""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    payload = token_cache.decode(authorization.split(" ", 1)[1])
+    if not payload:
+        return None
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
+        return None
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await run_db(load_user, user_id)
+        if user is not None:
+            user_cache.set(user)
+    return user
+
+
+INVALIDATION_CHANNEL = "auth:invalidate"
+
+
+def invalidate_user(user_id: int) -> None:
+    """Call after changing a user row; other workers drop their copy too on a shared backend."""
+    user_cache.invalidate(user_id)
+    if shared_state.shared:
+        shared_state.publish(INVALIDATION_CHANNEL, str(user_id))
+
+
+if shared_state.shared:
+    shared_state.subscribe(INVALIDATION_CHANNEL, lambda message: user_cache.invalidate(int(message)))
+
+
+def stats() -> Dict[str, Any]:
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
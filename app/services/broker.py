@@ -0,0 +1,172 @@
+from typing import Any, Callable, Dict, List, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import json
+import os
+import threading
+
+from .shared_state import shared_state
+
+# Pub/sub for push channels (e.g. the message board SSE stream). Handlers publish to a
+# topic; the backend carries the event to every process, and each process fans it out
+# to its local subscribers' queues on their event loop.
+
+Dispatch = Callable[[str, str], None]
+
+SUBSCRIBER_QUEUE_SIZE = int(os.environ.get("BROKER_QUEUE_SIZE", "100"))
+
+
+class LocalHub:
+    """Connects broker backends within one process; a stand-in for a shared server."""
+
+    def __init__(self):
+        self._dispatchers: List[Dispatch] = []
+        self._lock = threading.Lock()
+
+    def attach(self, dispatch: Dispatch) -> None:
+        with self._lock:
+            self._dispatchers.append(dispatch)
+
+    def detach(self, dispatch: Dispatch) -> None:
+        with self._lock:
+            if dispatch in self._dispatchers:
+                self._dispatchers.remove(dispatch)
+
+    def publish(self, topic: str, data: str) -> None:
+        with self._lock:
+            dispatchers = list(self._dispatchers)
+        for dispatch in dispatchers:
+            dispatch(topic, data)
+
+
+class InMemoryBackend:
+    """Single-process backend. Brokers sharing a LocalHub behave like workers sharing a server."""
+
+    def __init__(self, hub: Optional[LocalHub] = None):
+        self.hub = hub or LocalHub()
+        self._dispatch: Optional[Dispatch] = None
+
+    def start(self, dispatch: Dispatch) -> None:
+        self._dispatch = dispatch
+        self.hub.attach(dispatch)
+
+    def publish(self, topic: str, data: str) -> None:
+        self.hub.publish(topic, data)
+
+    def close(self) -> None:
+        if self._dispatch is not None:
+            self.hub.detach(self._dispatch)
+            self._dispatch = None
+
+
+class SharedStateBackend:
+    """Carries events over the shared-state pub/sub so every worker sees them.
+
+    Publishing is a network round trip, so it is handed to one sender thread: handlers
+    on the event loop never wait on it, and events still go out in publish order.
+    """
+
+    CHANNEL = "broker"
+
+    def __init__(self, state):
+        self.state = state
+        self._sender = ThreadPoolExecutor(max_workers=1, thread_name_prefix="broker-publish")
+
+    def start(self, dispatch: Dispatch) -> None:
+        self.state.subscribe(self.CHANNEL, lambda message: dispatch(*json.loads(message)))
+
+    def publish(self, topic: str, data: str) -> None:
+        self._sender.submit(self.state.publish, self.CHANNEL, json.dumps([topic, data]))
+
+    def close(self) -> None:
+        self._sender.shutdown(wait=True)
+
+
+class Subscription:
+    """One subscriber's bounded queue. A subscriber that falls behind is flagged
+    ``overflowed`` instead of growing without limit; it should resync and resubscribe."""
+
+    def __init__(self, topic: str, maxsize: int):
+        self.topic = topic
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next event, or None if nothing arrived within ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class MessageBroker:
+    def __init__(self, backend=None, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.backend = backend or InMemoryBackend()
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+        self.backend.start(self._dispatch)
+
+    def subscribe(self, topic: str) -> Subscription:
+        """Register a subscriber; must be called from the subscriber's event loop."""
+        sub = Subscription(topic, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(topic, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subscribers.get(sub.topic)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.topic]
+
+    def publish(self, topic: str, event: Dict[str, Any]) -> None:
+        """Send an event to every subscriber of ``topic`` in every process. Safe from any thread."""
+        self.published += 1
+        self.backend.publish(topic, json.dumps(event))
+
+    def _dispatch(self, topic: str, data: str) -> None:
+        with self._lock:
+            subs = list(self._subscribers.get(topic, ()))
+        if not subs:
+            return
+        event = json.loads(data)
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub._deliver, event)
+            except RuntimeError:
+                # The subscriber's loop has shut down
+                self.unsubscribe(sub)
+                continue
+            self.delivered += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "topics": len(self._subscribers),
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "published": self.published,
+                "delivered": self.delivered,
+            }
+
+    def close(self) -> None:
+        self.backend.close()
+
+
+def message_topic(year: int, team: str) -> str:
+    # Messages are stored under the team name as posted, so the topic uses it verbatim
+    return f"messages:{int(year)}:{team}"
+
+
+broker = MessageBroker(SharedStateBackend(shared_state) if shared_state.shared else InMemoryBackend())
@@ -0,0 +1,60 @@
+from typing import Any, Dict, Iterable, List
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from .. import models
+from .queries import delete_class_recruits, delete_class_players
+
+# Bulk write paths: one executemany INSERT per batch instead of an ORM object per row.
+# None of these commit; callers commit once per request.
+
+
+def recruit_row(year: int, team: str, r: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values for a Recruit from an uploaded/imported dict."""
+    return {
+        "year": int(year),
+        "team": team,
+        "name": str(r.get("name", "")).strip(),
+        "position": str(r.get("position", "") or "").strip(),
+        "stars": int(r.get("stars", 0) or 0),
+        "rank": int(r.get("rank", 0) or 0),
+        "outcome": str(r.get("outcome", "") or "").strip(),
+        "points": int(r.get("points", 0) or 0),
+        "rating": float(r["rating"]) if r.get("rating") not in (None, "") else None,
+        "note": str(r.get("note", "") or "").strip(),
+        "source": str(r.get("source", "") or "").strip(),
+    }
+
+
+def insert_recruits(db: Session, rows: List[Dict[str, Any]]) -> int:
+    if rows:
+        db.execute(insert(models.Recruit), rows)
+    return len(rows)
+
+
+def update_recruits(db: Session, rows: List[Dict[str, Any]]) -> int:
+    """Bulk UPDATE by primary key; each row holds ``id`` plus the columns to set."""
+    if rows:
+        db.execute(update(models.Recruit), rows)
+    return len(rows)
+
+
+def replace_recruits(db: Session, year: int, team: str, rows: List[Dict[str, Any]]) -> int:
+    """Delete a (year, team)'s recruits and insert ``rows`` in their place."""
+    db.execute(delete_class_recruits(year, team))
+    return insert_recruits(db, rows)
+
+
+def insert_rerank_players(db: Session, class_id: int, players: Iterable[Dict[str, Any]]) -> int:
+    rows = [
+        {"class_id": class_id, "name": p["name"], "points": p["points"], "note": p["note"]}
+        for p in players
+    ]
+    if rows:
+        db.execute(insert(models.RerankPlayer), rows)
+    return len(rows)
+
+
+def replace_rerank_players(db: Session, class_id: int, players: Iterable[Dict[str, Any]]) -> int:
+    db.execute(delete_class_players(class_id))
+    return insert_rerank_players(db, class_id, players)
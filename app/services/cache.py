@@ -0,0 +1,229 @@
+from typing import Any, Dict, Hashable, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import threading
+import time
+
+from fastapi.concurrency import run_in_threadpool
+
+from ..utils.teams import normalize_team_name
+from .shared_state import shared_state
+
+# Returned by ResponseCache.get when the key is absent or expired
+MISSING = object()
+
+CacheKey = Tuple[str, Optional[int], Optional[str], Tuple[Hashable, ...]]
+
+
+def cache_key(endpoint: str, year: Optional[int] = None, team: Optional[str] = None, *extra: Hashable) -> CacheKey:
+    """Build a key scoped to (endpoint, year, normalized team).
+
+    ``extra`` distinguishes variants of the same scope (e.g. query parameters) while
+    still being dropped by an invalidation of that scope.
+    """
+    return (endpoint, year, normalize_team_name(team) if team is not None else None, tuple(extra))
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with a per-entry TTL for read endpoint payloads."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: CacheKey) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: CacheKey, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, endpoint: Optional[str] = None, year: Optional[int] = None, team: Optional[str] = None) -> int:
+        """Drop entries matching every given field; ``None`` matches anything."""
+        team_key = normalize_team_name(team) if team is not None else None
+        with self._lock:
+            stale = [
+                k for k in self._data
+                if (endpoint is None or k[0] == endpoint)
+                and (year is None or k[1] == year)
+                and (team_key is None or k[2] == team_key)
+            ]
+            for k in stale:
+                del self._data[k]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+response_cache = ResponseCache(
+    maxsize=int(os.environ.get("RESPONSE_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("RESPONSE_CACHE_TTL", "300")),
+)
+
+
+class VersionRegistry:
+    """Per-scope version counters used to derive strong ETags.
+
+    A scope is (endpoint, year, normalized team); year-level resources such as the
+    leaderboard use ``team=None``. Write paths bump the scope they modify. Counters live
+    in the shared state, so every worker on a shared backend derives the same ETags.
+    """
+
+    def __init__(self, state):
+        self.state = state
+        # Distinguishes counter generations (a fresh process or a reset backend)
+        state.set_if_absent("versions:boot", os.urandom(8).hex())
+        self._boot = state.get("versions:boot")
+
+    @staticmethod
+    def _scope(endpoint: str, year: Optional[int], team: Optional[str]):
+        return (endpoint, year, normalize_team_name(team) if team is not None else None)
+
+    def _key(self, scope) -> str:
+        return f"version:{scope[0]}:{scope[1]}:{scope[2]}"
+
+    def bump(self, endpoint: str, year: Optional[int] = None, team: Optional[str] = None) -> int:
+        return self.state.incr(self._key(self._scope(endpoint, year, team)))
+
+    def get(self, endpoint: str, year: Optional[int] = None, team: Optional[str] = None) -> int:
+        return int(self.state.get(self._key(self._scope(endpoint, year, team))) or 0)
+
+    def etag(self, endpoint: str, year: Optional[int] = None, team: Optional[str] = None, version: Optional[int] = None) -> str:
+        """Strong ETag for a scope; pass ``version`` (from scope_version) to skip the lookup."""
+        scope = self._scope(endpoint, year, team)
+        if version is None:
+            version = self.get(endpoint, year, team)
+        raw = f"{self._boot}:{scope[0]}:{scope[1]}:{scope[2]}:{version}"
+        return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+versions = VersionRegistry(shared_state)
+
+
+def versioned_key(
+    endpoint: str, year: Optional[int] = None, team: Optional[str] = None, *extra: Hashable, version: Optional[int] = None
+) -> CacheKey:
+    """``cache_key`` that also carries the scope's current version.
+
+    Read the version before querying: an entry cached by this worker is then never
+    served after another worker has bumped it, even before that worker's invalidation
+    broadcast arrives.
+    """
+    if version is None:
+        version = versions.get(endpoint, year, team)
+    return cache_key(endpoint, year, team, version, *extra)
+
+
+async def off_loop(fn, *args):
+    """Call a shared-state function from a handler without blocking the event loop.
+
+    A shared backend does network I/O, so the call goes to the threadpool; the in-memory
+    backend is a dict lookup and runs inline.
+    """
+    if shared_state.shared:
+        return await run_in_threadpool(fn, *args)
+    return fn(*args)
+
+
+async def scope_version(endpoint: str, year: Optional[int] = None, team: Optional[str] = None) -> int:
+    """Current version of a scope, fetched once per request for both its ETag and cache key."""
+    return await off_loop(versions.get, endpoint, year, team)
+
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+# Lets a worker skip its own invalidations when they come back over pub/sub
+_origin = os.urandom(8).hex()
+
+
+# Endpoints whose payloads are derived from another endpoint's data across many scopes
+# (a team's history spans every year's leaderboard, and a year's re-rank moves the rank of
+# every team). Invalidating the source drops the dependent's single global scope.
+DEPENDENTS: Dict[str, Tuple[str, ...]] = {
+    "leaderboard": ("team_history",),
+    "class_meta": ("team_history",),
+}
+
+
+def invalidate(endpoint: str, year: Optional[int] = None, team: Optional[str] = None) -> None:
+    """Drop cached responses for a scope and bump its ETag version.
+
+    On a shared backend the invalidation is also broadcast so other workers drop
+    their local copies.
+    """
+    response_cache.invalidate(endpoint, year, team)
+    versions.bump(endpoint, year, team)
+    if shared_state.shared:
+        shared_state.publish(INVALIDATION_CHANNEL, json.dumps([_origin, endpoint, year, team]))
+    for dependent in DEPENDENTS.get(endpoint, ()):
+        invalidate(dependent)
+
+
+async def invalidate_async(endpoint: str, year: Optional[int] = None, team: Optional[str] = None) -> None:
+    """``invalidate`` for request handlers; the version bump still completes before it returns."""
+    await off_loop(invalidate, endpoint, year, team)
+
+
+def _on_invalidate(message: str) -> None:
+    origin, endpoint, year, team = json.loads(message)
+    if origin != _origin:
+        response_cache.invalidate(endpoint, year, team)
+
+
+if shared_state.shared:
+    shared_state.subscribe(INVALIDATION_CHANNEL, _on_invalidate)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value matches ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    return any((c[2:] if c.startswith("W/") else c) == etag for c in candidates)
@@ -0,0 +1,360 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
+import os
+import threading
+import time
+
+import requests
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..utils.teams import normalize_team_name
+from .http_cache import HTTPCache, get_http_cache
+from .bulk import recruit_row, insert_recruits, replace_recruits
+from .class_meta import Contribution, class_totals
+
+CFBD_BASE_URL = os.environ.get("CFBD_BASE_URL", "https://api.collegefootballdata.com")
+
+
+class CFBDError(Exception):
+    """Non-200 response from the College Football Data API."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# Shared by every request so concurrent imports respect one CFBD budget
+rate_limiter = TokenBucket(
+    rate=float(os.environ.get("CFBD_RATE_LIMIT", "5")),
+    capacity=int(os.environ.get("CFBD_BURST", "5")),
+)
+
+
+_NO_CACHE = object()
+
+
+class CFBDClient:
+    """CFBD API client behind the shared rate limiter and the on-disk response cache.
+
+    Fresh cache entries are served without a request; stale ones are revalidated with
+    If-None-Match/If-Modified-Since. With CFBD_CACHE_OFFLINE=1 only cached responses
+    are served, which lets imports run against recorded fixtures.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        limiter: Optional[TokenBucket] = None,
+        timeout: float = 30,
+        cache: Any = _NO_CACHE,
+        offline: Optional[bool] = None,
+    ):
+        self.base_url = (base_url or os.environ.get("CFBD_BASE_URL", CFBD_BASE_URL)).rstrip("/")
+        self.headers = {"Authorization": f"Bearer {api_key}"}
+        self.limiter = limiter if limiter is not None else rate_limiter
+        self.timeout = timeout
+        self.cache: Optional[HTTPCache] = get_http_cache() if cache is _NO_CACHE else cache
+        self.offline = os.environ.get("CFBD_CACHE_OFFLINE", "0") == "1" if offline is None else offline
+
+    def get_json(self, path: str, params: Dict[str, Any]) -> Any:
+        url = f"{self.base_url}{path}"
+        key = HTTPCache.key(url, params) if self.cache is not None else None
+        entry = self.cache.get(key) if self.cache is not None else None
+        if entry is not None and (self.offline or self.cache.is_fresh(entry, params)):
+            return json.loads(entry["body"]) or []
+        if self.offline:
+            raise CFBDError(504, f"Offline and no cached response for {path} {params}")
+
+        headers = dict(self.headers)
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        self.limiter.acquire()
+        resp = requests.get(url, params=params, headers=headers, timeout=self.timeout)
+        if resp.status_code == 304 and entry is not None:
+            self.cache.touch(key)
+            return json.loads(entry["body"]) or []
+        if resp.status_code != 200:
+            raise CFBDError(resp.status_code, resp.text[:200])
+        if self.cache is not None:
+            self.cache.put(key, resp.text, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+        return resp.json() or []
+
+    def recruiting_teams(self, year: int, team: Optional[str] = None) -> List[Dict[str, Any]]:
+        params: Dict[str, Any] = {"year": year}
+        if team is not None:
+            params["team"] = team
+        return self.get_json("/recruiting/teams", params)
+
+    def recruiting_players(self, year: int, team: Optional[str] = None) -> List[Dict[str, Any]]:
+        params: Dict[str, Any] = {"year": year}
+        if team is not None:
+            params["team"] = team
+        return self.get_json("/recruiting/players", params)
+
+
+def team_of(entry: Dict[str, Any]) -> str:
+    """Normalized team name of a /recruiting/teams or /recruiting/players entry."""
+    # Player entries carry the college in committedTo ("school" is the high school)
+    return normalize_team_name(entry.get("committedTo") or entry.get("team") or entry.get("school") or "")
+
+
+def build_class(meta: Dict[str, Any], players: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Turn a CFBD team entry and its players into recruit rows and ClassMeta values."""
+    national_rank = int(meta.get("rank", 0) or 0)
+    points = float(meta.get("points", 0.0) or 0.0)
+    avg_rating = float(meta.get("averageRating", 0.0) or 0.0)
+    avg_stars = float(meta.get("averageStars", 0.0) or 0.0)
+
+    items: List[Dict[str, Any]] = []
+    ratings: List[float] = []
+    stars_list: List[int] = []
+    for it in players:
+        name = str(it.get("athleteName") or it.get("name") or "").strip()
+        if not name:
+            continue
+        rating = float(it.get("rating") or it.get("compositeRating") or 0.0)
+        provided_rank = int(it.get("ranking") or it.get("compositeRanking") or it.get("overallRank") or 0)
+        position = str(it.get("position") or "").strip()
+        stars = int((it.get("stars") or 0) or 0)
+        items.append({
+            "name": name,
+            "rating": rating,
+            "rank": provided_rank,
+            "position": position,
+            "stars": stars,
+        })
+        if rating > 0:
+            ratings.append(rating)
+        if stars > 0:
+            stars_list.append(stars)
+
+    # Fallbacks if team meta lacked data
+    if avg_rating == 0.0 and ratings:
+        avg_rating = round(sum(ratings) / len(ratings), 4)
+    if avg_stars == 0.0 and stars_list:
+        avg_stars = round(sum(stars_list) / len(stars_list), 3)
+
+    # Fill missing individual ranks by rating
+    missing = [x for x in items if not x["rank"]]
+    if missing:
+        sorted_all = sorted(items, key=lambda x: x["rating"], reverse=True)
+        rank_map = {x["name"]: i + 1 for i, x in enumerate(sorted_all)}
+        for x in items:
+            if not x["rank"]:
+                x["rank"] = rank_map.get(x["name"], 0)
+
+    # commits counts the recruits actually stored (not CFBD's figure) so it agrees with
+    # the running totals that add/delete and class_meta.rebuild maintain
+    class_meta = {
+        "national_rank": national_rank, "points": points, "avg_rating": avg_rating, "avg_stars": avg_stars,
+        "commits": len(items),
+    }
+    return items, class_meta
+
+
+def _recruit_row(year: int, team: str, x: Dict[str, Any]) -> Dict[str, Any]:
+    return recruit_row(year, team, {**x, "rating": x["rating"] or None, "source": "cfbd"})
+
+
+def _stored_meta(items: List[Dict[str, Any]], class_meta: Dict[str, Any]) -> Dict[str, Any]:
+    """ClassMeta column values: the public fields plus the internal running sums."""
+    return {**class_meta, **class_totals([Contribution(x["stars"], x["rating"]) for x in items])}
+
+
+def write_class(db: Session, year: int, team: str, items: List[Dict[str, Any]], class_meta: Dict[str, Any]) -> int:
+    """Replace a (year, team) class's recruits and upsert its ClassMeta. Does not commit."""
+    replace_recruits(db, year, team, [_recruit_row(year, team, x) for x in items])
+
+    values = _stored_meta(items, class_meta)
+    existing = db.query(models.ClassMeta).filter(models.ClassMeta.year == year, models.ClassMeta.team == team).first()
+    if existing:
+        for field, value in values.items():
+            setattr(existing, field, value)
+    else:
+        db.add(models.ClassMeta(year=year, team=team, **values))
+    return len(items)
+
+
+def fetch_class(client: CFBDClient, year: int, team: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Per-team fetch: one /recruiting/teams and one /recruiting/players request."""
+    t_data = client.recruiting_teams(year, team)
+    meta = t_data[0] if t_data else {}
+    players = client.recruiting_players(year, team)
+    return build_class(meta, players)
+
+
+def group_year(
+    t_data: List[Dict[str, Any]], all_players: List[Dict[str, Any]]
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+    """Index a year's team entries and players by normalized team name."""
+    meta_by_team: Dict[str, Dict[str, Any]] = {}
+    for t in t_data:
+        team = team_of(t)
+        if team and team not in meta_by_team:
+            meta_by_team[team] = t
+    players_by_team: Dict[str, List[Dict[str, Any]]] = {}
+    for p in all_players:
+        players_by_team.setdefault(team_of(p), []).append(p)
+    return meta_by_team, players_by_team
+
+
+def fetch_year(client: CFBDClient, year: int, pool: ThreadPoolExecutor):
+    """Fetch the whole year's teams and players (two requests, issued concurrently)."""
+    teams_future = pool.submit(client.recruiting_teams, year)
+    players_future = pool.submit(client.recruiting_players, year)
+    return group_year(teams_future.result(), players_future.result())
+
+
+def write_year(db: Session, year: int, classes: Dict[str, Tuple[List[Dict[str, Any]], Dict[str, Any]]]) -> int:
+    """Replace recruits and upsert ClassMeta for many teams of a year. Does not commit.
+
+    Uses one DELETE for all recruits and one SELECT for existing ClassMeta rows instead
+    of a round trip per team.
+    """
+    if not classes:
+        return 0
+    teams = list(classes)
+    db.query(models.Recruit).filter(
+        models.Recruit.year == year, models.Recruit.team.in_(teams)
+    ).delete(synchronize_session=False)
+    existing = {
+        cm.team: cm
+        for cm in db.query(models.ClassMeta).filter(models.ClassMeta.year == year, models.ClassMeta.team.in_(teams))
+    }
+    saved = insert_recruits(db, [_recruit_row(year, team, x) for team, (items, _) in classes.items() for x in items])
+    for team, (items, class_meta) in classes.items():
+        values = _stored_meta(items, class_meta)
+        cm = existing.get(team)
+        if cm:
+            for field, value in values.items():
+                setattr(cm, field, value)
+        else:
+            db.add(models.ClassMeta(year=year, team=team, **values))
+    return saved
+
+
+def fetch_year_classes(client: CFBDClient, year: int) -> Tuple[Dict[str, Tuple[List[Dict[str, Any]], Dict[str, Any]]], Dict[str, Any]]:
+    """Network half of the year import: two requests, grouped into per-team classes.
+
+    Teams listed by /recruiting/teams but absent from the players payload are reported
+    in ``missing`` and left untouched rather than having their recruits wiped.
+    """
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        meta_by_team, players_by_team = fetch_year(client, year, pool)
+
+    classes = {}
+    missing: List[str] = []
+    for team, meta in meta_by_team.items():
+        players = players_by_team.get(team)
+        if not players:
+            missing.append(team)
+            continue
+        classes[team] = build_class(meta, players)
+    return classes, {"teams": len(meta_by_team), "imported": len(classes), "missing": missing}
+
+
+def commit_year(db: Session, year: int, classes: Dict[str, Tuple[List[Dict[str, Any]], Dict[str, Any]]]) -> int:
+    """Write a year's classes in one transaction."""
+    try:
+        saved = write_year(db, year, classes)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return saved
+
+
+def bulk_import_year(
+    year: int,
+    client: CFBDClient,
+    session_factory: Callable[[], Session],
+    workers: int = 4,
+    on_team: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """Import every team's class for a year.
+
+    The year's /recruiting/teams and /recruiting/players payloads are fetched once and
+    grouped by team. Only teams missing from the year-level players payload fall back
+    to a per-team players request, run on a bounded worker pool behind the shared rate
+    limiter. Each team is committed as soon as its data is ready, so an interrupted run
+    keeps the teams already written. As in the year import, a team with no players even
+    after the fallback is reported in ``missing`` and its recruits are left untouched.
+    """
+    with ThreadPoolExecutor(max_workers=max(2, workers)) as pool:
+        meta_by_team, players_by_team = fetch_year(client, year, pool)
+
+        imported = 0
+        errors: Dict[str, str] = {}
+        missing: List[str] = []
+
+        def save(team: str, items: List[Dict[str, Any]], class_meta: Dict[str, Any]) -> None:
+            nonlocal imported
+            db = session_factory()
+            try:
+                write_class(db, year, team, items, class_meta)
+                db.commit()
+            except Exception as e:  # noqa: BLE001
+                db.rollback()
+                errors[team] = str(e)
+                return
+            finally:
+                db.close()
+            imported += 1
+            if on_team is not None:
+                on_team(team)
+
+        pending = {}
+        for team, meta in meta_by_team.items():
+            players = players_by_team.get(team)
+            if players:
+                items, class_meta = build_class(meta, players)
+                save(team, items, class_meta)
+            else:
+                pending[pool.submit(client.recruiting_players, year, team)] = team
+
+        for fut in as_completed(pending):
+            team = pending[fut]
+            try:
+                players = fut.result()
+                if not players:
+                    missing.append(team)
+                    continue
+                items, class_meta = build_class(meta_by_team[team], players)
+            except Exception as e:  # noqa: BLE001
+                errors[team] = str(e)
+                continue
+            save(team, items, class_meta)
+
+    return {"teams": len(meta_by_team), "imported": imported, "missing": sorted(missing), "errors": errors}
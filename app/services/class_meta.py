@@ -0,0 +1,120 @@
+from typing import List, NamedTuple, Optional, Tuple
+import re
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from .. import models
+
+# ClassMeta keeps running sums and counts of its recruits' stars and ratings, so adding,
+# deleting or editing one recruit adjusts the averages in O(1) instead of reloading the
+# class. Only positive stars/ratings count, as in the CFBD import. rebuild() recomputes
+# everything from the recruits table and is the consistency check.
+
+RATING_NOTE = re.compile(r"rating:\s*([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)")
+
+
+class Contribution(NamedTuple):
+    """What one recruit adds to its class aggregates."""
+    stars: int
+    rating: Optional[float]
+
+
+def rating_from_note(note: Optional[str]) -> Optional[float]:
+    """Legacy ``rating:<value>`` notes written by the CFBD import before ``Recruit.rating``."""
+    match = RATING_NOTE.search(note or "")
+    return float(match.group(1)) if match else None
+
+
+def contribution_of(recruit: models.Recruit) -> Contribution:
+    return Contribution(int(recruit.stars or 0), recruit.rating)
+
+
+def class_totals(items: List[Contribution]) -> dict:
+    """Initial commit count and aggregate columns for a freshly written class."""
+    stars = [c.stars for c in items if c.stars > 0]
+    ratings = [c.rating for c in items if c.rating and c.rating > 0]
+    return {
+        "commits": len(items),
+        "stars_sum": sum(stars),
+        "stars_count": len(stars),
+        "rating_sum": sum(ratings),
+        "rating_count": len(ratings),
+    }
+
+
+def _refresh_averages(cm: models.ClassMeta) -> None:
+    if cm.commits <= 0:
+        cm.commits = 0
+        cm.avg_stars = 0.0
+        cm.avg_rating = 0.0
+        return
+    # Without any known values keep what the source reported
+    if cm.stars_count > 0:
+        cm.avg_stars = round(cm.stars_sum / cm.stars_count, 3)
+    if cm.rating_count > 0:
+        cm.avg_rating = round(cm.rating_sum / cm.rating_count, 4)
+
+
+def apply_change(cm: models.ClassMeta, old: Optional[Contribution], new: Optional[Contribution]) -> None:
+    """Adjust aggregates for one recruit: ``old=None`` is an insert, ``new=None`` a delete."""
+    for c, sign in ((old, -1), (new, 1)):
+        if c is None:
+            continue
+        cm.commits = (cm.commits or 0) + sign
+        if c.stars > 0:
+            cm.stars_sum = (cm.stars_sum or 0) + sign * c.stars
+            cm.stars_count = (cm.stars_count or 0) + sign
+        if c.rating and c.rating > 0:
+            cm.rating_sum = (cm.rating_sum or 0.0) + sign * c.rating
+            cm.rating_count = (cm.rating_count or 0) + sign
+    _refresh_averages(cm)
+
+
+def update_for_recruit(db: Session, year: int, team: str, old: Optional[Contribution], new: Optional[Contribution]) -> None:
+    """apply_change on the (year, team) ClassMeta row, if there is one. Does not commit."""
+    cm = db.query(models.ClassMeta).filter(models.ClassMeta.year == year, models.ClassMeta.team == team).first()
+    if cm:
+        apply_change(cm, old, new)
+
+
+def rebuild(db: Session, year: Optional[int] = None, team: Optional[str] = None) -> List[Tuple[int, str]]:
+    """Recompute aggregates for ClassMeta rows in scope with one GROUP BY over recruits.
+
+    Call it from every path that replaces a class's recruits wholesale (uploads, imports)
+    so the running sums are re-seeded in the same transaction. Returns the (year, team)
+    pairs whose stored aggregates had drifted. Does not commit.
+    """
+    r = models.Recruit
+    q = db.query(
+        r.year, r.team,
+        func.count(r.id),
+        func.coalesce(func.sum(case((r.stars > 0, r.stars), else_=0)), 0),
+        func.count(case((r.stars > 0, 1))),
+        func.coalesce(func.sum(case((r.rating > 0, r.rating), else_=0.0)), 0.0),
+        func.count(case((r.rating > 0, 1))),
+    ).group_by(r.year, r.team)
+    metas = db.query(models.ClassMeta)
+    if year is not None:
+        q = q.filter(r.year == year)
+        metas = metas.filter(models.ClassMeta.year == year)
+    if team is not None:
+        q = q.filter(r.team == team)
+        metas = metas.filter(models.ClassMeta.team == team)
+    totals = {(y, t): rest for y, t, *rest in q}
+
+    drifted: List[Tuple[int, str]] = []
+    for cm in metas:
+        commits, stars_sum, stars_count, rating_sum, rating_count = totals.get((cm.year, cm.team), (0, 0, 0, 0.0, 0))
+        if (
+            cm.commits != commits or cm.stars_sum != stars_sum or cm.stars_count != stars_count
+            or cm.rating_count != rating_count or abs((cm.rating_sum or 0.0) - rating_sum) > 1e-6
+        ):
+            drifted.append((cm.year, cm.team))
+        cm.commits = commits
+        cm.stars_sum = int(stars_sum)
+        cm.stars_count = stars_count
+        cm.rating_sum = float(rating_sum)
+        cm.rating_count = rating_count
+        _refresh_averages(cm)
+    return drifted
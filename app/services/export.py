@@ -0,0 +1,116 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from itertools import groupby
+import csv
+import io
+import json
+import os
+
+from sqlalchemy import select, union
+from sqlalchemy.orm import Session
+
+from .. import models
+from .leaderboard import read_leaderboard
+
+# Streaming exports: rows come off a server-side cursor (yield_per) and are encoded into
+# ~64 KiB chunks, so memory stays flat however many rows a table holds. Each generator
+# owns its session because the response body is produced after the handler returns.
+
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", "1000"))
+CHUNK_BYTES = 64 * 1024
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+RECRUIT_FIELDS = ["id", "year", "team", "name", "position", "stars", "rank", "outcome", "points", "rating", "note", "source", "created_at"]
+CLASS_FIELDS = ["class_id", "year", "team", "total_points", "avg_points", "player_count", "created_at", "created_by"]
+PLAYER_FIELDS = ["player_id", "name", "points", "note"]
+LEADERBOARD_FIELDS = ["year", "rank", "team", "class_id", "total_points", "avg_points", "commits", "has_rerank"]
+
+
+def _jsonable(value: Any) -> Any:
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def encode(records: Iterable[Dict[str, Any]], fmt: str, fields: List[str]) -> Iterator[bytes]:
+    """Encode dicts as NDJSON lines or CSV rows (with header), batched into chunks."""
+    buf = io.StringIO()
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(buf, fieldnames=fields, extrasaction="ignore", lineterminator="\n")
+        writer.writeheader()
+    for record in records:
+        if writer is not None:
+            writer.writerow({k: _jsonable(v) for k, v in record.items()})
+        else:
+            buf.write(json.dumps({k: _jsonable(v) for k, v in record.items()}, ensure_ascii=False))
+            buf.write("\n")
+        if buf.tell() >= CHUNK_BYTES:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def with_session(session_factory: Callable[[], Session], produce: Callable[[Session], Iterable[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+    db = session_factory()
+    try:
+        yield from produce(db)
+    finally:
+        db.close()
+
+
+def recruits(db: Session, year: Optional[int] = None, team: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    r = models.Recruit
+    stmt = select(*(getattr(r, f) for f in RECRUIT_FIELDS)).order_by(r.year, r.team, r.rank, r.id)
+    if year is not None:
+        stmt = stmt.where(r.year == year)
+    if team is not None:
+        stmt = stmt.where(r.team == team)
+    for row in db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)):
+        yield dict(row._mapping)
+
+
+def classes(db: Session, year: Optional[int] = None, flat: bool = False) -> Iterator[Dict[str, Any]]:
+    """Rerank classes with their players from one ordered join.
+
+    ``flat`` yields one record per player (for CSV); otherwise one record per class with
+    a nested ``players`` list.
+    """
+    rc, rp = models.RerankClass, models.RerankPlayer
+    stmt = (
+        select(
+            rc.id.label("class_id"), rc.year, rc.team, rc.total_points, rc.avg_points, rc.player_count,
+            rc.created_at, rc.created_by,
+            rp.id.label("player_id"), rp.name, rp.points, rp.note,
+        )
+        .outerjoin(rp, rp.class_id == rc.id)
+        .order_by(rc.year, rc.team, rc.id, rp.points.desc(), rp.id)
+    )
+    if year is not None:
+        stmt = stmt.where(rc.year == year)
+    rows = (dict(row._mapping) for row in db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)))
+    if flat:
+        yield from rows
+        return
+    for _, group in groupby(rows, key=lambda row: row["class_id"]):
+        players = []
+        record: Dict[str, Any] = {}
+        for row in group:
+            record = {f: row[f] for f in CLASS_FIELDS}
+            if row["player_id"] is not None:
+                players.append({"id": row["player_id"], "name": row["name"], "points": row["points"], "note": row["note"]})
+        record["players"] = players
+        yield record
+
+
+def leaderboards(db: Session, year: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Leaderboard rows for one year, or every year that has rerank classes or a snapshot."""
+    if year is not None:
+        years: Iterable[int] = [year]
+    else:
+        years = list(db.scalars(
+            union(select(models.RerankClass.year), select(models.LeaderboardSnapshot.year)).order_by("year")
+        ))
+    for y in years:
+        for row in read_leaderboard(db, y)["rows"]:
+            yield row
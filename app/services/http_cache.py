@@ -0,0 +1,91 @@
+from typing import Any, Dict, Optional
+from datetime import datetime
+from urllib.parse import urlencode
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_PATH = os.environ.get("CFBD_CACHE_PATH", "./cfbd_cache.db")
+# Freshness for the current recruiting cycle; settled past years never expire
+CURRENT_CYCLE_TTL = float(os.environ.get("CFBD_CACHE_TTL", "3600"))
+
+
+class HTTPCache:
+    """SQLite-backed store of GET responses keyed on URL and query params.
+
+    Entries keep the response's ETag/Last-Modified so stale entries can be
+    revalidated with a conditional request instead of a full download.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, current_cycle_ttl: float = CURRENT_CYCLE_TTL):
+        self.path = path
+        self.current_cycle_ttl = current_cycle_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, body TEXT NOT NULL, etag TEXT, last_modified TEXT, stored_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key(url: str, params: Dict[str, Any]) -> str:
+        return f"{url}?{urlencode(sorted((k, str(v)) for k, v in params.items()))}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        return {"body": row[0], "etag": row[1], "last_modified": row[2], "stored_at": row[3]}
+
+    def put(self, key: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body, etag, last_modified, stored_at) VALUES (?, ?, ?, ?, ?)",
+                (key, body, etag, last_modified, time.time()),
+            )
+            self._conn.commit()
+
+    def touch(self, key: str) -> None:
+        """Mark an entry fresh again after a 304 revalidation."""
+        with self._lock:
+            self._conn.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+    def max_age(self, params: Dict[str, Any]) -> Optional[float]:
+        """Seconds an entry stays fresh; None means forever (past recruiting years)."""
+        try:
+            year = int(params.get("year"))
+        except (TypeError, ValueError):
+            return self.current_cycle_ttl
+        if year < datetime.utcnow().year:
+            return None
+        return self.current_cycle_ttl
+
+    def is_fresh(self, entry: Dict[str, Any], params: Dict[str, Any]) -> bool:
+        max_age = self.max_age(params)
+        return max_age is None or (time.time() - entry["stored_at"]) < max_age
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+
+_default_cache: Optional[HTTPCache] = None
+_default_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HTTPCache]:
+    """Process-wide CFBD response cache, or None when CFBD_CACHE=0."""
+    global _default_cache
+    if os.environ.get("CFBD_CACHE", "1") == "0":
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = HTTPCache()
+        return _default_cache
@@ -0,0 +1,347 @@
+from typing import Dict, List, Any, Optional
+from datetime import datetime
+from sqlalchemy import select, func, delete, insert, and_, union
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..utils.teams import ALL_TEAMS, normalize_team_name
+
+
+def latest_classes_query(year: int, team: Optional[str] = None):
+    """Statement behind ``latest_classes``: a window function picks one class per stored
+    team name; the player count comes from the denormalized ``player_count`` column."""
+    rc = models.RerankClass
+    conditions = [rc.year == year]
+    if team is not None:
+        conditions.append(func.lower(func.trim(rc.team)) == normalize_team_name(team).lower())
+    ranked = (
+        select(
+            rc.id, rc.year, rc.team, rc.total_points, rc.avg_points, rc.player_count, rc.created_at, rc.created_by,
+            func.row_number().over(
+                partition_by=rc.team,
+                order_by=(rc.created_by.is_(None), rc.created_at.desc(), rc.id.desc()),
+            ).label("rn"),
+        )
+        .where(*conditions)
+        .subquery()
+    )
+    return (
+        select(
+            ranked.c.id, ranked.c.year, ranked.c.team, ranked.c.total_points, ranked.c.avg_points,
+            ranked.c.player_count.label("commits"),
+        )
+        .where(ranked.c.rn == 1)
+        .order_by(ranked.c.created_by.is_(None), ranked.c.created_at.desc(), ranked.c.id.desc())
+    )
+
+
+def team_ratings_query(year: int):
+    """Per-team recruit rating averages for a year, best first, aggregated in SQL.
+
+    Only positive ratings count, as in the CFBD import and the ClassMeta aggregates."""
+    r = models.Recruit
+    return (
+        select(
+            r.team,
+            func.avg(r.rating).label("avg_rating"),
+            func.max(r.rating).label("max_rating"),
+            func.count(r.rating).label("rated"),
+        )
+        .where(r.year == year, r.rating > 0)
+        .group_by(r.team)
+        .order_by(func.avg(r.rating).desc(), r.team)
+    )
+
+
+def team_ratings(db: Session, year: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "rank": i + 1,
+            "team": row.team,
+            "avg_rating": round(float(row.avg_rating), 4),
+            "max_rating": float(row.max_rating),
+            "rated": int(row.rated),
+        }
+        for i, row in enumerate(db.execute(team_ratings_query(year)))
+    ]
+
+
+def latest_classes(db: Session, year: int, team: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Latest rerank class per team for a year (user-created preferred) with its player count.
+
+    Runs as a single query. Pass ``team`` to restrict the lookup to one (normalized) team.
+    """
+    stmt = latest_classes_query(year, team)
+
+    # Stored team names are not always normalized; rows arrive in preference order so the
+    # first one seen per normalized name wins.
+    latest_by_team: Dict[str, Dict[str, Any]] = {}
+    for row in db.execute(stmt):
+        key = normalize_team_name(row.team)
+        if key in latest_by_team:
+            continue
+        latest_by_team[key] = {
+            "class_id": row.id,
+            "year": row.year,
+            "total_points": row.total_points,
+            "avg_points": row.avg_points,
+            "commits": int(row.commits or 0),
+        }
+    return latest_by_team
+
+
+def _leaderboard_row(year: int, team: str, rc: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if rc:
+        return {
+            "team": team,
+            "year": rc["year"],
+            "class_id": rc["class_id"],
+            "total_points": rc["total_points"],
+            "avg_points": rc["avg_points"],
+            "commits": rc["commits"],
+            "has_rerank": True
+        }
+    return {
+        "team": team,
+        "year": year,
+        "class_id": None,
+        "total_points": 0,
+        "avg_points": 0,
+        "commits": 0,
+        "has_rerank": False
+    }
+
+
+def _rank_key(row: Dict[str, Any]):
+    # 1) Has rerank data, 2) Total points (descending), 3) Alphabetical
+    return (not row["has_rerank"], -(row["total_points"] or 0), row["team"])
+
+
+def build_leaderboard(db: Session, year: int) -> Dict[str, Any]:
+    """Compute the leaderboard for a year from the rerank classes."""
+    latest_by_team = latest_classes(db, year)
+
+    rows: List[Dict[str, Any]] = []
+    for team_name in ALL_TEAMS:
+        normalized_team = normalize_team_name(team_name)
+        rows.append(_leaderboard_row(year, normalized_team, latest_by_team.get(normalized_team)))
+
+    rows.sort(key=_rank_key)
+    for idx, r in enumerate(rows, start=1):
+        r["rank"] = idx
+
+    return {"year": year, "count": len(rows), "rows": rows}
+
+
+# Materialized leaderboard (leaderboard_snapshot table)
+LEADERBOARD_TEAMS = {normalize_team_name(t) for t in ALL_TEAMS}
+
+
+def _snapshot_to_row(s: models.LeaderboardSnapshot) -> Dict[str, Any]:
+    return {
+        "team": s.team,
+        "year": s.year,
+        "class_id": s.class_id,
+        "total_points": s.total_points,
+        "avg_points": s.avg_points,
+        "commits": s.commits,
+        "has_rerank": s.class_id is not None,
+        "rank": s.rank,
+    }
+
+
+def rebuild_snapshot(db: Session, year: int) -> None:
+    """Recompute every snapshot row for a year. Does not commit."""
+    board = build_leaderboard(db, year)
+    db.execute(delete(models.LeaderboardSnapshot).where(models.LeaderboardSnapshot.year == year))
+    now = datetime.utcnow()
+    rows = [
+        {
+            "year": year,
+            "team": r["team"],
+            "class_id": r["class_id"],
+            "total_points": r["total_points"],
+            "avg_points": r["avg_points"],
+            "commits": r["commits"],
+            "rank": r["rank"],
+            "updated_at": now,
+        }
+        for r in board["rows"]
+    ]
+    if rows:
+        db.execute(insert(models.LeaderboardSnapshot), rows)
+
+
+def snapshot_query(year: int):
+    return (
+        select(models.LeaderboardSnapshot)
+        .where(models.LeaderboardSnapshot.year == year)
+        .order_by(models.LeaderboardSnapshot.rank.asc())
+    )
+
+
+def _snapshot_rows(db: Session, year: int) -> List[models.LeaderboardSnapshot]:
+    return list(db.scalars(snapshot_query(year)))
+
+
+def refresh_team_snapshot(db: Session, year: int, team: str) -> None:
+    """Refresh one team's snapshot row and re-rank only that year. Does not commit.
+
+    Call this from every write path that creates, replaces or deletes a rerank class.
+    """
+    team = normalize_team_name(team)
+    if team not in LEADERBOARD_TEAMS:
+        return
+    db.flush()
+    snapshots = _snapshot_rows(db, year)
+    if not snapshots:
+        rebuild_snapshot(db, year)
+        return
+
+    current = _leaderboard_row(year, team, latest_classes(db, year, team).get(team))
+    by_team = {s.team: s for s in snapshots}
+    target = by_team.get(team)
+    if target is None:
+        rebuild_snapshot(db, year)
+        return
+    target.class_id = current["class_id"]
+    target.total_points = current["total_points"]
+    target.avg_points = current["avg_points"]
+    target.commits = current["commits"]
+    target.updated_at = datetime.utcnow()
+
+    ordered = sorted(snapshots, key=lambda s: _rank_key(_snapshot_to_row(s)))
+    for idx, s in enumerate(ordered, start=1):
+        if s.rank != idx:
+            s.rank = idx
+    db.flush()
+
+
+def read_leaderboard(db: Session, year: int) -> Dict[str, Any]:
+    """Leaderboard for a year served from the snapshot table, built on first read."""
+    snapshots = _snapshot_rows(db, year)
+    if not snapshots:
+        try:
+            rebuild_snapshot(db, year)
+            db.commit()
+        except IntegrityError:
+            # Another request materialized the year first
+            db.rollback()
+        snapshots = _snapshot_rows(db, year)
+    rows = [_snapshot_to_row(s) for s in snapshots]
+    return {"year": year, "count": len(rows), "rows": rows}
+
+
+def snapshot_for_team(db: Session, year: int, team: str) -> Optional[models.LeaderboardSnapshot]:
+    """Single-row lookup of a team's materialized leaderboard entry."""
+    stmt = select(models.LeaderboardSnapshot).where(
+        models.LeaderboardSnapshot.year == year,
+        models.LeaderboardSnapshot.team == normalize_team_name(team),
+    )
+    snap = db.scalars(stmt).first()
+    if snap is None and normalize_team_name(team) in LEADERBOARD_TEAMS:
+        read_leaderboard(db, year)
+        snap = db.scalars(stmt).first()
+    return snap
+
+
+def team_history_query(team: str):
+    """One row per year in which ``team`` has a rerank class or ClassMeta: its snapshot
+    entry joined with its recruiting metadata.
+
+    A (year, team) with duplicate ClassMeta rows contributes only its newest row, so the
+    metadata fields of one history row always come from the same ClassMeta.
+    """
+    team = normalize_team_name(team)
+    s, cm = models.LeaderboardSnapshot, models.ClassMeta
+    years = union(
+        select(s.year).where(s.team == team, s.class_id.isnot(None)),
+        select(cm.year).where(cm.team == team),
+    ).subquery()
+    latest_meta = (
+        select(cm.year, func.max(cm.id).label("meta_id"))
+        .where(cm.team == team)
+        .group_by(cm.year)
+        .subquery()
+    )
+    return (
+        select(
+            years.c.year, s.class_id, s.rank, s.total_points, s.avg_points, s.commits,
+            cm.id.label("meta_id"),
+            cm.national_rank,
+            cm.points.label("recruiting_points"),
+            cm.avg_rating,
+            cm.avg_stars,
+            cm.commits.label("signed"),
+        )
+        .select_from(years)
+        .outerjoin(s, and_(s.year == years.c.year, s.team == team))
+        .outerjoin(latest_meta, latest_meta.c.year == years.c.year)
+        .outerjoin(cm, cm.id == latest_meta.c.meta_id)
+        .order_by(years.c.year)
+    )
+
+
+def _materialize_missing_years(db: Session) -> None:
+    """Build snapshots for years that have rerank classes but were never read."""
+    materialized = select(models.LeaderboardSnapshot.year).distinct()
+    for year in db.scalars(
+        select(models.RerankClass.year).distinct().where(models.RerankClass.year.not_in(materialized))
+    ):
+        read_leaderboard(db, year)
+
+
+def _slope(points: List[tuple]) -> float:
+    """Least-squares change in y per year; 0 with fewer than two years."""
+    if len(points) < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in points) / var, 3) if var else 0.0
+
+
+def team_history(db: Session, team: str) -> Dict[str, Any]:
+    """A team's per-year rerank results and recruiting metadata with a short trend summary."""
+    team = normalize_team_name(team)
+    _materialize_missing_years(db)
+    rows: List[Dict[str, Any]] = []
+    previous_rank: Optional[int] = None
+    for r in db.execute(team_history_query(team)):
+        has_rerank = r.class_id is not None
+        rank = r.rank if has_rerank else None
+        rows.append({
+            "year": r.year,
+            "class_id": r.class_id,
+            "has_rerank": has_rerank,
+            "rank": rank,
+            "rank_change": previous_rank - rank if rank is not None and previous_rank is not None else None,
+            "total_points": r.total_points or 0,
+            "avg_points": r.avg_points or 0.0,
+            "commits": r.commits or 0,
+            "class_meta": {
+                "national_rank": r.national_rank,
+                "points": r.recruiting_points,
+                "avg_rating": r.avg_rating,
+                "avg_stars": r.avg_stars,
+                "commits": r.signed,
+            } if r.meta_id is not None else None,
+        })
+        if rank is not None:
+            previous_rank = rank
+
+    reranked = [row for row in rows if row["has_rerank"]]
+    best = min(reranked, key=lambda row: (row["rank"], row["year"]), default=None)
+    return {
+        "team": team,
+        "count": len(rows),
+        "rows": rows,
+        "summary": {
+            "rerank_years": len(reranked),
+            "best_rank": {"year": best["year"], "rank": best["rank"]} if best else None,
+            "avg_total_points": round(sum(r["total_points"] for r in reranked) / len(reranked), 2) if reranked else 0.0,
+            "total_points_per_year": _slope([(r["year"], r["total_points"]) for r in reranked]),
+            "rank_per_year": _slope([(r["year"], r["rank"]) for r in reranked]),
+        },
+    }
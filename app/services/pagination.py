@@ -0,0 +1,84 @@
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+from datetime import datetime
+import base64
+import json
+
+from sqlalchemy import and_, or_
+
+# Keyset pagination: a cursor encodes the sort key of the last row served, and the next
+# page starts strictly after it. Unlike OFFSET, each page is an index range seek, so
+# page 1000 costs the same as page 1.
+
+MAX_PAGE_SIZE = 500
+
+
+class SortKey(NamedTuple):
+    """Columns a listing is ordered by, ending in a unique column so the order is total."""
+    columns: Tuple[Any, ...]
+    descending: bool = False
+
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Sort-key values from a cursor; raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(payload, list) or len(payload) != size:
+        raise ValueError("invalid cursor")
+    return [_decode_value(v) for v in payload]
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if set(value) != {"dt"} or not isinstance(value["dt"], str):
+            raise ValueError("invalid cursor")
+        try:
+            return datetime.fromisoformat(value["dt"])
+        except ValueError as e:
+            raise ValueError("invalid cursor") from e
+    if value is not None and not isinstance(value, (str, int, float)):
+        raise ValueError("invalid cursor")
+    return value
+
+
+def after(columns: Sequence[Any], values: Sequence[Any], descending: bool):
+    """WHERE clause selecting rows strictly past ``values`` in (columns...) order.
+
+    Expanded as (a > x) OR (a = x AND b > y) ... so it works on every backend and
+    seeks on a composite index whose trailing columns match ``columns``.
+    """
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        step = column < value if descending else column > value
+        clauses.append(and_(*(c == v for c, v in zip(columns[:i], values[:i])), step))
+    return or_(*clauses)
+
+
+def ordered(stmt, key: SortKey, values: Optional[Sequence[Any]] = None):
+    """``stmt`` ordered by ``key``, starting strictly after ``values`` when given."""
+    if values is not None:
+        stmt = stmt.where(after(key.columns, values, key.descending))
+    return stmt.order_by(*(c.desc() if key.descending else c.asc() for c in key.columns))
+
+
+def paginate(db, stmt, key: SortKey, cursor: Optional[str], limit: int) -> Tuple[list, Optional[str]]:
+    """Run one page of a select() ordered by ``key``. Returns (rows, next cursor or None)."""
+    values = decode_cursor(cursor, len(key.columns)) if cursor else None
+    rows = list(db.scalars(ordered(stmt, key, values).limit(limit + 1)))
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, c.key) for c in key.columns])
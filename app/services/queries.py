@@ -0,0 +1,56 @@
+from typing import Optional
+
+from sqlalchemy import select, delete
+
+from .. import models
+from .pagination import SortKey
+
+# Statements behind the request handlers' filtered reads and deletes. migrate_indexes.py
+# checks the query plan of these same builders, so an index that stops serving a
+# handler shows up there.
+
+RECRUIT_ORDER = SortKey((models.Recruit.rank, models.Recruit.id))
+RATING_ORDER = SortKey((models.Recruit.rating, models.Recruit.id), descending=True)
+MESSAGE_ORDER = SortKey((models.Message.created_at, models.Message.id), descending=True)
+CLASS_ORDER = SortKey((models.RerankClass.year, models.RerankClass.id), descending=True)
+
+
+def class_recruits_query(year: int, team: str):
+    return select(models.Recruit).where(models.Recruit.year == year, models.Recruit.team == team)
+
+
+def rated_recruits_query(year: int, team: Optional[str] = None):
+    """Recruits with a positive rating; unrated players are stored as NULL (or 0 before migration)."""
+    stmt = select(models.Recruit).where(models.Recruit.year == year, models.Recruit.rating > 0)
+    if team is not None:
+        stmt = stmt.where(models.Recruit.team == team)
+    return stmt
+
+
+def delete_class_recruits(year: int, team: str):
+    return delete(models.Recruit).where(models.Recruit.year == year, models.Recruit.team == team)
+
+
+def class_meta_query(year: int, team: str):
+    return select(models.ClassMeta).where(models.ClassMeta.year == year, models.ClassMeta.team == team)
+
+
+def team_classes_query(year: int, team: str, user_created: Optional[bool] = None):
+    """A team's rerank classes for a year, newest first; ``user_created`` filters on created_by."""
+    rc = models.RerankClass
+    stmt = select(rc).where(rc.year == year, rc.team == team)
+    if user_created is not None:
+        stmt = stmt.where(rc.created_by.isnot(None) if user_created else rc.created_by.is_(None))
+    return stmt.order_by(rc.created_at.desc())
+
+
+def class_players_query(class_id: int):
+    return select(models.RerankPlayer).where(models.RerankPlayer.class_id == class_id)
+
+
+def delete_class_players(class_id: int):
+    return delete(models.RerankPlayer).where(models.RerankPlayer.class_id == class_id)
+
+
+def team_messages_query(year: int, team: str):
+    return select(models.Message).where(models.Message.year == year, models.Message.team == team)
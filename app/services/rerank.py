@@ -1,6 +1,11 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
+from collections import OrderedDict
 import json
 import os
+import re
+import threading
+
+from .rerank_archive import RerankArchive
 
 # Point system reference (for documentation)
 POINT_SYSTEM = {
@@ -17,25 +22,32 @@ POINT_SYSTEM = {
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "rerank")
 
+# Classes live in the packed per-year archive; legacy {year}_{slug}.json files are still
+# read for anything not yet converted (see convert_rerank_archive.py).
+archive = RerankArchive(DATA_DIR)
+
+
+def _class_path(year: int, team_slug: str) -> str:
+    return os.path.join(DATA_DIR, f"{year}_{team_slug}.json")
+
 
 def _load_class_file(year: int, team_slug: str) -> List[Dict[str, Any]]:
-    path = os.path.join(DATA_DIR, f"{year}_{team_slug}.json")
+    path = _class_path(year, team_slug)
     if not os.path.isfile(path):
         return []
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
-def _slugify_team(team: str) -> str:
-    return team.strip().lower().replace(" ", "_")
+CONTROL_CHARS = re.compile(r"[\x00-\x1f\x7f]")
 
 
-def get_class_summary(year: int, team: str) -> Dict[str, Any]:
-    team_slug = _slugify_team(team)
-    players = _load_class_file(year, team_slug)
-    if not players:
-        return {"year": year, "team": team, "players": [], "total_points": 0, "avg_points": 0.0}
+def _slugify_team(team: str) -> str:
+    # Control characters (tabs, newlines) would break the archive's line-based index
+    return CONTROL_CHARS.sub(" ", team).strip().lower().replace(" ", "_")
 
+
+def _summarize(players: List[Dict[str, Any]]) -> Dict[str, Any]:
     # Ensure points and sort
     for p in players:
         p["points"] = int(p.get("points", 0))
@@ -43,10 +55,107 @@ def get_class_summary(year: int, team: str) -> Dict[str, Any]:
 
     total = sum(p.get("points", 0) for p in players_sorted)
     avg = total / max(1, len(players_sorted))
-    return {
-        "year": year,
-        "team": team,
-        "players": players_sorted,
-        "total_points": total,
-        "avg_points": round(avg, 2),
-    }
\ No newline at end of file
+    return {"players": players_sorted, "total_points": total, "avg_points": round(avg, 2)}
+
+
+class SummaryCache:
+    """Bounded LRU of computed class summaries keyed on (year, slug).
+
+    Each entry remembers a version of its source: the archive record's (offset, length)
+    or a legacy file's (mtime, size). A lookup whose version no longer matches is a
+    miss, so edits made outside the API are picked up too.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Tuple[int, str], Tuple[Tuple, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Tuple[int, str], version: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Tuple[int, str], version: Tuple, summary: Dict[str, Any]) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (version, summary)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Tuple[int, str]) -> None:
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+summary_cache = SummaryCache(maxsize=int(os.environ.get("RERANK_SUMMARY_CACHE_SIZE", "256")))
+
+
+def invalidate_class_summary(year: int, team: str) -> None:
+    """Drop the cached summary after the class is rewritten."""
+    summary_cache.invalidate((int(year), _slugify_team(team)))
+
+
+def save_class_players(year: int, team: str, players: List[Dict[str, Any]]) -> None:
+    """Append a class to the year's archive and drop its cached summary."""
+    archive.append(year, _slugify_team(team), players)
+    invalidate_class_summary(year, team)
+
+
+def _source_version(year: int, team_slug: str) -> Optional[Tuple]:
+    located = archive.locate(year, team_slug)
+    if located is not None:
+        return ("archive",) + located
+    try:
+        stat = os.stat(_class_path(year, team_slug))
+    except OSError:
+        return None
+    return ("json", stat.st_mtime_ns, stat.st_size)
+
+
+def get_class_summary(year: int, team: str) -> Dict[str, Any]:
+    team_slug = _slugify_team(team)
+    key = (int(year), team_slug)
+    version = _source_version(year, team_slug)
+    if version is None:
+        return {"year": year, "team": team, "players": [], "total_points": 0, "avg_points": 0.0}
+
+    summary = summary_cache.get(key, version)
+    if summary is None:
+        if version[0] == "archive":
+            players = archive.read(year, team_slug) or []
+        else:
+            players = _load_class_file(year, team_slug)
+        summary = _summarize(players) if players else {"players": [], "total_points": 0, "avg_points": 0.0}
+        summary_cache.set(key, version, summary)
+    return {"year": year, "team": team, **summary}
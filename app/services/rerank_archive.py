@@ -0,0 +1,191 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+import json
+import mmap
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts fall back to the in-process lock
+    fcntl = None
+
+# Packed rerank store: one append-only data file per year ({year}.rra) holding compact
+# JSON records back to back, plus a tab-separated offset index ({year}.idx) of
+# "slug<TAB>offset<TAB>length" lines. A later index line for a slug supersedes earlier
+# ones; compact() rewrites a year keeping only the live records. Writers serialize on a
+# per-year lock file ({year}.lock) that compaction never replaces, so an append always
+# lands in the files that are current once it holds the lock.
+
+DATA_EXT = ".rra"
+INDEX_EXT = ".idx"
+LOCK_EXT = ".lock"
+
+
+def _paths(data_dir: str, year: int) -> Tuple[str, str]:
+    base = os.path.join(data_dir, str(int(year)))
+    return base + DATA_EXT, base + INDEX_EXT
+
+
+class _YearArchive:
+    """Reader state for one year: parsed index plus a memory map of the data file."""
+
+    def __init__(self):
+        self.index: Dict[str, Tuple[int, int]] = {}
+        self.index_ino: Optional[int] = None
+        self.index_pos = 0
+        self.data_ino: Optional[int] = None
+        self.mm: Optional[mmap.mmap] = None
+
+    def close(self) -> None:
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+
+
+class RerankArchive:
+    """Append-only, memory-mapped per-year archive of rerank classes."""
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self._years: Dict[int, _YearArchive] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    # Reads
+
+    def _refresh_index(self, year: int, state: _YearArchive, index_path: str) -> None:
+        """Parse index lines appended since the last call (or all of them after a compaction)."""
+        try:
+            st = os.stat(index_path)
+        except OSError:
+            state.index, state.index_ino, state.index_pos = {}, None, 0
+            return
+        if st.st_ino != state.index_ino or st.st_size < state.index_pos:
+            state.index, state.index_ino, state.index_pos = {}, st.st_ino, 0
+            state.close()
+        if st.st_size == state.index_pos:
+            return
+        with open(index_path, "rb") as f:
+            f.seek(state.index_pos)
+            chunk = f.read(st.st_size - state.index_pos)
+        # Only consume whole lines; a concurrent append may still be mid-write
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            try:
+                slug, offset, length = line.decode("utf-8").split("\t")
+                state.index[slug] = (int(offset), int(length))
+            except ValueError:
+                # A damaged line loses that one class, not the whole year
+                continue
+        state.index_pos += end
+
+    def _map(self, state: _YearArchive, data_path: str, needed: int) -> Optional[mmap.mmap]:
+        if state.mm is not None and len(state.mm) >= needed:
+            return state.mm
+        state.close()
+        with open(data_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < needed or size == 0:
+                return None
+            state.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return state.mm
+
+    def locate(self, year: int, slug: str) -> Optional[Tuple[int, int]]:
+        """(offset, length) of the live record for a class, or None."""
+        data_path, index_path = _paths(self.data_dir, year)
+        with self._lock:
+            state = self._years.setdefault(int(year), _YearArchive())
+            self._refresh_index(year, state, index_path)
+            return state.index.get(slug)
+
+    def read(self, year: int, slug: str) -> Optional[List[Dict[str, Any]]]:
+        """Players for one class via a slice of the mapped data file, or None if absent."""
+        data_path, index_path = _paths(self.data_dir, year)
+        with self._lock:
+            state = self._years.setdefault(int(year), _YearArchive())
+            self._refresh_index(year, state, index_path)
+            entry = state.index.get(slug)
+            if entry is None:
+                return None
+            offset, length = entry
+            mm = self._map(state, data_path, offset + length)
+            if mm is None:
+                return None
+            raw = mm[offset:offset + length]
+        return json.loads(raw)
+
+    def slugs(self, year: int) -> List[str]:
+        _, index_path = _paths(self.data_dir, year)
+        with self._lock:
+            state = self._years.setdefault(int(year), _YearArchive())
+            self._refresh_index(year, state, index_path)
+            return sorted(state.index)
+
+    # Writes
+
+    @contextmanager
+    def _exclusive(self, year: int) -> Iterator[None]:
+        """Hold the year's write lock across threads and worker processes."""
+        os.makedirs(self.data_dir, exist_ok=True)
+        lock_path = os.path.join(self.data_dir, str(int(year)) + LOCK_EXT)
+        with self._write_lock, open(lock_path, "ab") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def append(self, year: int, slug: str, players: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Append a class record and point the index at it. Returns (offset, length).
+
+        Raises ValueError for a slug containing a tab or line break, which the index
+        format cannot hold.
+        """
+        if any(c in slug for c in "\t\r\n"):
+            raise ValueError(f"invalid archive slug: {slug!r}")
+        data_path, index_path = _paths(self.data_dir, year)
+        record = json.dumps(players, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        # Open the files only once the lock is held: a compaction may have just replaced them
+        with self._exclusive(year), open(data_path, "ab") as data, open(index_path, "ab") as index:
+            offset = data.seek(0, os.SEEK_END)
+            data.write(record + b"\n")
+            data.flush()
+            # The index line goes in only after the record is on disk
+            index.write(f"{slug}\t{offset}\t{len(record)}\n".encode("utf-8"))
+            index.flush()
+        return offset, len(record)
+
+    def compact(self, year: int) -> int:
+        """Rewrite a year's archive with only the live record per class. Returns records kept.
+
+        Holds the year's write lock throughout, so appends from other workers wait for
+        the swap and then write to the new files instead of being lost with the old ones.
+        """
+        data_path, index_path = _paths(self.data_dir, year)
+        with self._exclusive(year):
+            live = {slug: self.read(year, slug) for slug in self.slugs(year)}
+            tmp_data, tmp_index = data_path + ".tmp", index_path + ".tmp"
+            with open(tmp_data, "wb") as data, open(tmp_index, "wb") as index:
+                for slug, players in sorted(live.items()):
+                    record = json.dumps(players, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                    offset = data.tell()
+                    data.write(record + b"\n")
+                    index.write(f"{slug}\t{offset}\t{len(record)}\n".encode("utf-8"))
+            with self._lock:
+                os.replace(tmp_data, data_path)
+                os.replace(tmp_index, index_path)
+                state = self._years.pop(int(year), None)
+                if state is not None:
+                    state.close()
+        return len(live)
+
+    def years(self) -> List[int]:
+        if not os.path.isdir(self.data_dir):
+            return []
+        return sorted(
+            int(name[:-len(INDEX_EXT)]) for name in os.listdir(self.data_dir)
+            if name.endswith(INDEX_EXT) and name[:-len(INDEX_EXT)].isdigit()
+        )
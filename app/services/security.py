@@ -1,5 +1,10 @@
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+import threading
+import time
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 
@@ -9,6 +14,13 @@ SECRET_KEY = "dev-secret-change"  # replace via env in production
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
 
+# bcrypt is deliberately slow (tens to hundreds of ms per call), so it runs on its own
+# bounded pool instead of the event loop or the shared threadpool used for DB work.
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", "64"))
+
+T = TypeVar("T")
+
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -18,6 +30,79 @@ def verify_password(password: str, password_hash: str) -> bool:
     return pwd_context.verify(password, password_hash)
 
 
+class PasswordPoolBusy(RuntimeError):
+    """Raised when the hashing queue is full; callers should answer 503 and let clients retry."""
+
+
+class PasswordPool:
+    """Runs hash/verify calls on at most ``workers`` threads, with at most ``max_pending``
+    calls queued or running. The bcrypt backend releases the GIL, so threads hash in parallel.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.run_total = 0.0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolBusy("password hashing queue is full")
+            self.pending += 1
+        queued_at = time.perf_counter()
+
+        def job() -> T:
+            started = time.perf_counter()
+            with self._lock:
+                self.running += 1
+                waited = started - queued_at
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self.run_total += time.perf_counter() - started
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            done = self.completed or 1
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "running": self.running,
+                "queued": self.pending - self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.wait_total / done * 1000, 2),
+                "max_wait_ms": round(self.wait_max * 1000, 2),
+                "avg_run_ms": round(self.run_total / done * 1000, 2),
+            }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+password_pool = PasswordPool()
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -0,0 +1,152 @@
+from typing import Callable, Dict, List, Optional, Tuple
+import os
+import threading
+import time
+
+try:
+    import redis
+except ImportError:  # only needed when SHARED_STATE_URL points at Redis
+    redis = None
+
+# State that must agree across uvicorn workers: TTL'd keys, atomic counters and pub/sub.
+# MemoryState serves a single process; RedisState (SHARED_STATE_URL=redis://...) is
+# shared by every worker pointed at the same server.
+
+Callback = Callable[[str], None]
+
+SHARED_STATE_URL = os.environ.get("SHARED_STATE_URL", "memory://")
+SHARED_STATE_PREFIX = os.environ.get("SHARED_STATE_PREFIX", "sbe:")
+
+
+class MemoryState:
+    """In-process implementation; ``shared`` is False because other workers cannot see it."""
+
+    shared = False
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Optional[float], str]] = {}
+        self._subscribers: Dict[str, List[Callback]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, str(value))
+
+    def set_if_absent(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._data[key] = (time.monotonic() + ttl if ttl else None, str(value))
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        with self._lock:
+            value = int(self._live(key) or 0) + amount
+            entry = self._data.get(key)
+            self._data[key] = (entry[0] if entry else None, str(value))
+            return value
+
+    def publish(self, channel: str, message: str) -> None:
+        with self._lock:
+            callbacks = list(self._subscribers.get(channel, ()))
+        for callback in callbacks:
+            callback(message)
+
+    def subscribe(self, channel: str, callback: Callback) -> None:
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(callback)
+
+    def close(self) -> None:
+        with self._lock:
+            self._subscribers.clear()
+
+
+class RedisState:
+    """Redis-backed implementation (any server speaking the Redis protocol).
+
+    Keys are namespaced with ``prefix``. Subscriptions share one pub/sub connection
+    served by a background thread that invokes callbacks with the message text.
+    """
+
+    shared = True
+
+    def __init__(self, url: str, prefix: str = SHARED_STATE_PREFIX):
+        if redis is None:
+            raise RuntimeError("SHARED_STATE_URL uses Redis but the 'redis' package is not installed")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, decode_responses=True, health_check_interval=30)
+        self._pubsub = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    def get(self, key: str) -> Optional[str]:
+        return self._client.get(self._key(key))
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        self._client.set(self._key(key), value, px=int(ttl * 1000) if ttl else None)
+
+    def set_if_absent(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        return bool(self._client.set(self._key(key), value, px=int(ttl * 1000) if ttl else None, nx=True))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._key(key))
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        return int(self._client.incrby(self._key(key), amount))
+
+    def publish(self, channel: str, message: str) -> None:
+        self._client.publish(self._key(channel), message)
+
+    def subscribe(self, channel: str, callback: Callback) -> None:
+        handler = lambda msg: callback(msg["data"])
+        with self._lock:
+            if self._pubsub is None:
+                self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                self._pubsub.subscribe(**{self._key(channel): handler})
+                self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+            else:
+                self._pubsub.subscribe(**{self._key(channel): handler})
+
+    def close(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                self._thread.stop()
+                self._thread.join(timeout=5)  # it may be mid-read on the pub/sub socket
+                self._thread = None
+            if self._pubsub is not None:
+                self._pubsub.close()
+                self._pubsub = None
+        self._client.close()
+
+
+def create_state(url: str = SHARED_STATE_URL):
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisState(url)
+    if url in ("", "memory://"):
+        return MemoryState()
+    raise ValueError(f"Unsupported SHARED_STATE_URL: {url}")
+
+
+shared_state = create_state()
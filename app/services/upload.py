@@ -0,0 +1,296 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Union
+from collections import OrderedDict
+import csv
+import json
+import os
+import threading
+import time
+import uuid
+
+from sqlalchemy.orm import Session
+
+from .bulk import recruit_row, insert_recruits
+from .queries import delete_class_recruits
+from . import class_meta
+
+# Streaming recruit uploads: rows are parsed as the body arrives and written in
+# fixed-size batches, so memory stays flat regardless of file size.
+
+UPLOAD_BATCH_SIZE = int(os.environ.get("UPLOAD_BATCH_SIZE", "1000"))
+MAX_REPORTED_ERRORS = 100
+MAX_RECORD_CHARS = int(os.environ.get("UPLOAD_MAX_RECORD_CHARS", "65536"))
+
+FORMATS = {
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json-lines": "ndjson",
+    "text/csv": "csv",
+    "application/csv": "csv",
+}
+
+
+class UploadError(ValueError):
+    """A row that cannot be turned into a recruit; carries its line number."""
+
+    def __init__(self, line: int, detail: str):
+        super().__init__(f"line {line}: {detail}")
+        self.line = line
+        self.detail = detail
+
+
+def detect_format(fmt: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    if fmt:
+        fmt = fmt.lower()
+        return {"jsonl": "ndjson"}.get(fmt, fmt) if fmt in ("ndjson", "jsonl", "csv") else None
+    if content_type:
+        return FORMATS.get(content_type.split(";")[0].strip().lower())
+    return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Union[str, UploadError]]]:
+    """Yield (line number, text) for each line of a byte stream, holding one partial line at most.
+
+    A line longer than MAX_RECORD_CHARS (counted as UTF-8 bytes) yields an UploadError
+    instead of its text and is skipped up to the next newline without being buffered.
+    """
+    limit = MAX_RECORD_CHARS * 4  # worst case for UTF-8
+    pending = bytearray()
+    scanned = 0  # bytes of ``pending`` already known to hold no newline
+    skipping = False
+    line_no = 0
+    async for chunk in chunks:
+        if skipping:
+            end = chunk.find(b"\n")
+            if end < 0:
+                continue
+            chunk = chunk[end + 1:]
+            skipping = False
+        pending += chunk
+        start = 0
+        while True:
+            end = pending.find(b"\n", scanned)
+            if end < 0:
+                break
+            line_no += 1
+            yield line_no, pending[start:end].decode("utf-8-sig" if line_no == 1 else "utf-8").rstrip("\r")
+            start = scanned = end + 1
+        del pending[:start]
+        scanned = len(pending)
+        if scanned > limit:
+            line_no += 1
+            yield line_no, UploadError(line_no, f"line longer than {limit} bytes")
+            pending.clear()
+            scanned = 0
+            skipping = True
+    if pending:
+        line_no += 1
+        yield line_no, pending.decode("utf-8-sig" if line_no == 1 else "utf-8").rstrip("\r")
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    async for line_no, text in iter_lines(chunks):
+        if isinstance(text, UploadError):
+            yield line_no, text
+            continue
+        if not text.strip():
+            continue
+        try:
+            yield line_no, json.loads(text)
+        except json.JSONDecodeError as e:
+            yield line_no, UploadError(line_no, f"invalid JSON ({e.msg})")
+
+
+# Quote states, mirroring the csv module's parser: only a quote at the start of a
+# field opens a quoted field; one inside an unquoted field is a literal character.
+_FIELD_START, _IN_FIELD, _IN_QUOTED, _QUOTE_IN_QUOTED = range(4)
+
+
+def _scan_quotes(text: str, state: int) -> int:
+    """Advance the quote state over one line of a CSV record."""
+    if state != _IN_QUOTED and '"' not in text:
+        return _IN_FIELD
+    for ch in text:
+        if state == _IN_QUOTED:
+            if ch == '"':
+                state = _QUOTE_IN_QUOTED
+        elif ch == ",":
+            state = _FIELD_START
+        elif ch == '"' and state == _FIELD_START:
+            state = _IN_QUOTED
+        elif ch == '"' and state == _QUOTE_IN_QUOTED:
+            state = _IN_QUOTED  # doubled quote inside a quoted field
+        else:
+            state = _IN_FIELD
+    return state
+
+
+async def iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    """CSV with a header row; quoted fields may span up to MAX_RECORD_CHARS."""
+    header: Optional[List[str]] = None
+    record: List[str] = []
+    size = 0
+    state = _FIELD_START
+    start = 0
+    async for line_no, text in iter_lines(chunks):
+        if isinstance(text, UploadError):
+            record, size = [], 0
+            yield line_no, text
+            continue
+        if not record:
+            start = line_no
+            state = _FIELD_START
+        record.append(text)
+        size += len(text) + 1
+        state = _scan_quotes(text, state)
+        if state == _IN_QUOTED:
+            if size > MAX_RECORD_CHARS:
+                record, size = [], 0
+                yield start, UploadError(start, f"record longer than {MAX_RECORD_CHARS} characters")
+            continue  # the quoted field continues on the next line
+        joined = "\n".join(record)
+        record, size = [], 0
+        if not joined.strip():
+            continue
+        values = next(csv.reader([joined]))
+        if header is None:
+            header = [h.strip().lower() for h in values]
+            continue
+        if len(values) != len(header):
+            yield start, UploadError(start, f"expected {len(header)} columns, got {len(values)}")
+            continue
+        yield start, dict(zip(header, values))
+    if record:
+        yield start, UploadError(start, "unterminated quoted field")
+
+
+def parse_row(line_no: int, item: Any) -> Dict[str, Any]:
+    """Validate one parsed record and return Recruit column values."""
+    if isinstance(item, UploadError):
+        raise item
+    if not isinstance(item, dict):
+        raise UploadError(line_no, "expected an object")
+    try:
+        year = int(item.get("year"))
+    except (TypeError, ValueError):
+        raise UploadError(line_no, "year must be an integer")
+    team = str(item.get("team", "") or "").strip()
+    if not team:
+        raise UploadError(line_no, "team is required")
+    try:
+        row = recruit_row(year, team, item)
+    except (TypeError, ValueError):
+        raise UploadError(line_no, "stars, rank and points must be integers and rating a number")
+    if not row["name"]:
+        raise UploadError(line_no, "name is required")
+    return row
+
+
+def write_batch(db: Session, rows: List[Dict[str, Any]], new_groups: List[Tuple[int, str]]) -> int:
+    """Replace groups seen for the first time in this upload, insert the batch and
+    re-seed the ClassMeta aggregates of every group it touched."""
+    for year, team in new_groups:
+        db.execute(delete_class_recruits(year, team))
+    saved = insert_recruits(db, rows)
+    for year, team in set(new_groups) | {(r["year"], r["team"]) for r in rows}:
+        class_meta.rebuild(db, year, team)
+    db.commit()
+    return saved
+
+
+class UploadProgress:
+    """Registry of recent uploads so clients can poll progress by upload id."""
+
+    def __init__(self, maxsize: int = 100):
+        self.maxsize = maxsize
+        self._uploads: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, upload_id: Optional[str], fmt: str) -> str:
+        upload_id = upload_id or uuid.uuid4().hex
+        with self._lock:
+            self._uploads[upload_id] = {
+                "upload_id": upload_id,
+                "format": fmt,
+                "status": "running",
+                "rows": 0,
+                "saved": 0,
+                "rejected": 0,
+                "batches": 0,
+                "groups": 0,
+                "errors": [],
+                "started_at": time.time(),
+                "finished_at": None,
+            }
+            self._uploads.move_to_end(upload_id)
+            while len(self._uploads) > self.maxsize:
+                self._uploads.popitem(last=False)
+        return upload_id
+
+    def update(self, upload_id: str, **fields: Any) -> None:
+        with self._lock:
+            entry = self._uploads.get(upload_id)
+            if entry is not None:
+                entry.update(fields)
+
+    def reject(self, upload_id: str, error: UploadError) -> None:
+        with self._lock:
+            entry = self._uploads.get(upload_id)
+            if entry is None:
+                return
+            entry["rejected"] += 1
+            if len(entry["errors"]) < MAX_REPORTED_ERRORS:
+                entry["errors"].append({"line": error.line, "detail": error.detail})
+
+    def get(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._uploads.get(upload_id)
+            return dict(entry, errors=list(entry["errors"])) if entry is not None else None
+
+
+upload_progress = UploadProgress()
+
+
+async def stream_upload(
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    upload_id: str,
+    run_db,
+    seen: Set[Tuple[int, str]],
+    batch_size: int = UPLOAD_BATCH_SIZE,
+) -> None:
+    """Parse, validate and write an upload in batches, adding each (year, team) to ``seen``.
+
+    Each (year, team) in the upload replaces that class's existing recruits, as the
+    JSON upload does; batches commit as they go so locks are held briefly.
+    """
+    records = iter_ndjson(chunks) if fmt == "ndjson" else iter_csv(chunks)
+    batch: List[Dict[str, Any]] = []
+    new_groups: List[Tuple[int, str]] = []
+    rows = saved = batches = 0
+
+    async def flush() -> None:
+        nonlocal saved, batches, batch, new_groups
+        if not batch and not new_groups:
+            return
+        saved += await run_db(write_batch, batch, new_groups)
+        batches += 1
+        batch, new_groups = [], []
+        upload_progress.update(upload_id, rows=rows, saved=saved, batches=batches, groups=len(seen))
+
+    async for line_no, item in records:
+        rows += 1
+        try:
+            row = parse_row(line_no, item)
+        except UploadError as e:
+            upload_progress.reject(upload_id, e)
+            continue
+        group = (row["year"], row["team"])
+        if group not in seen:
+            seen.add(group)
+            new_groups.append(group)
+        batch.append(row)
+        if len(batch) >= batch_size:
+            await flush()
+    await flush()
+    upload_progress.update(upload_id, rows=rows, groups=len(seen))
@@ -0,0 +1,28 @@
+from typing import List
+
+# Teams shown on the rerank leaderboard
+ALL_TEAMS: List[str] = [
+    "Alabama", "Arkansas", "Auburn", "Florida", "Georgia", "Kentucky", "LSU",
+    "Mississippi State", "Missouri", "Ole Miss", "South Carolina", "Tennessee",
+    "Texas A&M", "Vanderbilt", "Texas", "Oklahoma", "Arizona", "Arizona State",
+    "Baylor", "BYU", "Cincinnati", "Colorado", "Houston", "Iowa State", "Kansas",
+    "Kansas State", "Oklahoma State", "TCU", "Texas Tech", "UCF", "Utah",
+    "West Virginia", "Illinois", "Indiana", "Iowa", "Maryland", "Michigan",
+    "Michigan State", "Minnesota", "Nebraska", "Northwestern", "Ohio State",
+    "Penn State", "Purdue", "Rutgers", "Wisconsin", "Oregon", "UCLA", "USC",
+    "Washington", "Oregon State", "Washington State", "Boston College",
+    "Clemson", "Duke", "Florida State", "Georgia Tech", "Louisville", "Miami",
+    "North Carolina", "NC State", "Pittsburgh", "Syracuse", "Virginia",
+    "Virginia Tech", "Wake Forest", "California", "Stanford", "SMU",
+    "Notre Dame", "UConn", "UMass", "Army", "Navy", "Air Force"
+]
+
+
+# Team name normalization
+def normalize_team_name(name: str) -> str:
+    try:
+        cleaned = str(name or "").strip()
+        # Simple title-case normalization to ensure leading capitals (e.g., 'oklahoma state' -> 'Oklahoma State')
+        return cleaned.title()
+    except Exception:
+        return str(name or "").strip()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark recruit writes: an ORM ``db.add`` loop against the bulk ``insert_recruits`` path.
+
+Usage:
+    python bench_bulk_insert.py [--rows N] [--repeat R]
+
+Uses DATABASE_URL like the app. Each run inserts N synthetic recruits into an unused
+year inside a transaction that is rolled back, so nothing is left behind. Timings include
+the flush that sends the rows to the database, not the commit both paths share.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import Base, engine
+from app.services.bulk import insert_recruits, recruit_row
+
+BENCH_YEAR = 1800  # no real class uses it
+POSITIONS = ["QB", "RB", "WR", "TE", "OL", "DL", "LB", "CB", "S", "K"]
+TEAMS = ["Alabama", "Georgia", "Ohio State", "Texas", "LSU", "Oregon", "Clemson", "Michigan"]
+
+
+def sample_recruits(count):
+    return [
+        recruit_row(BENCH_YEAR, TEAMS[i % len(TEAMS)], {
+            "name": f"Bench Recruit {i}",
+            "position": random.choice(POSITIONS),
+            "stars": random.randint(2, 5),
+            "rank": i + 1,
+            "rating": round(random.uniform(0.80, 1.0), 4),
+            "source": "bench",
+        })
+        for i in range(count)
+    ]
+
+
+def orm_add_loop(db, rows):
+    for row in rows:
+        db.add(models.Recruit(**row))
+    db.flush()
+
+
+def bulk_insert(db, rows):
+    insert_recruits(db, rows)
+    db.flush()
+
+
+def timed(write, rows):
+    with Session(engine) as db:
+        started = time.perf_counter()
+        write(db, rows)
+        elapsed = time.perf_counter() - started
+        db.rollback()
+    return elapsed
+
+
+def bench(count, repeat):
+    Base.metadata.create_all(bind=engine)
+    rows = sample_recruits(count)
+    # Warm up the connection pool and statement caches before timing
+    timed(bulk_insert, rows[:100])
+    timed(orm_add_loop, rows[:100])
+
+    print(f"Inserting {count} recruits, best/median of {repeat} run(s):")
+    results = {}
+    for label, write in (("ORM db.add loop", orm_add_loop), ("insert_recruits", bulk_insert)):
+        runs = [timed(write, rows) for _ in range(repeat)]
+        results[label] = min(runs)
+        print(
+            f"  {label:16} {count / min(runs):10,.0f} rows/s best, "
+            f"{count / statistics.median(runs):10,.0f} rows/s median ({min(runs) * 1000:.0f} ms)"
+        )
+    print(f"✅ insert_recruits is {results['ORM db.add loop'] / results['insert_recruits']:.1f}x the ORM loop")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare ORM and bulk recruit inserts")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    bench(args.rows, args.repeat)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Seed a throwaway database with many years of rerank classes and time the leaderboard.
+
+Usage:
+    python bench_leaderboard.py [--years N] [--classes-per-team C] [--players P] [--database-url URL]
+
+Reports queries issued and latency per year for:
+  per-team counts   the old path: load every class, then COUNT players per leaderboard team
+  build_leaderboard the single aggregated query (what a snapshot rebuild runs)
+  read_leaderboard  what the endpoint serves: cold (materializes the snapshot), then warm
+
+Without --database-url it seeds a temporary SQLite file and deletes it afterwards. A
+URL given explicitly must point at an empty database; the seeded rows are left in it.
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, func, insert, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import Base, apply_sqlite_pragmas, engine_options
+from app.services.leaderboard import build_leaderboard, read_leaderboard
+from app.utils.teams import ALL_TEAMS, normalize_team_name
+
+FIRST_YEAR = 2000
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def seed(engine, years, classes_per_team, players):
+    """Insert ``classes_per_team`` classes per team and year, alternating user and auto."""
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    with Session(engine) as db:
+        if db.scalar(select(func.count(models.RerankClass.id))):
+            raise SystemExit("❌ Target database already has rerank classes; point --database-url at an empty one")
+        user = models.User(email="bench@example.com", password_hash="x", is_admin=0)
+        db.add(user)
+        db.flush()
+        base_time = datetime(2024, 1, 1)
+        class_id = 0
+        classes, rows = [], []
+        for year in range(FIRST_YEAR, FIRST_YEAR + years):
+            for team in ALL_TEAMS:
+                for n in range(classes_per_team):
+                    class_id += 1
+                    points = [random.randint(0, 100) for _ in range(players)]
+                    classes.append({
+                        "id": class_id,
+                        "year": year,
+                        "team": team,
+                        "total_points": sum(points),
+                        "avg_points": sum(points) // players,
+                        "player_count": players,
+                        "created_at": base_time + timedelta(minutes=class_id),
+                        "created_by": user.id if n % 2 == 0 else None,
+                    })
+                    rows.extend({"class_id": class_id, "name": f"Player {i}", "points": p, "note": ""} for i, p in enumerate(points))
+        db.execute(insert(models.RerankClass), classes)
+        db.execute(insert(models.RerankPlayer), rows)
+        db.commit()
+    print(
+        f"Seeded {years} years x {len(ALL_TEAMS)} teams x {classes_per_team} classes "
+        f"({len(classes)} classes, {len(rows)} players) in {time.perf_counter() - started:.1f}s"
+    )
+
+
+def per_team_counts(db, year):
+    """The leaderboard as it was built before the aggregated query, for comparison."""
+    classes = db.query(models.RerankClass).filter(models.RerankClass.year == year).order_by(models.RerankClass.created_at.desc()).all()
+    latest_by_team = {}
+    for rc in classes:
+        key = normalize_team_name(rc.team)
+        if key not in latest_by_team or (rc.created_by is not None and latest_by_team[key].created_by is None):
+            latest_by_team[key] = rc
+    rows = []
+    for team_name in ALL_TEAMS:
+        rc = latest_by_team.get(normalize_team_name(team_name))
+        commits = db.query(models.RerankPlayer).filter(models.RerankPlayer.class_id == rc.id).count() if rc else 0
+        rows.append((team_name, commits))
+    return rows
+
+
+def measure(engine, counter, label, build, years):
+    queries, latencies = [], []
+    for year in range(FIRST_YEAR, FIRST_YEAR + years):
+        with Session(engine) as db:
+            before = counter.count
+            started = time.perf_counter()
+            build(db, year)
+            latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(counter.count - before)
+    print(
+        f"  {label:18} {statistics.mean(queries):6.1f} queries/year  "
+        f"{statistics.median(latencies):8.2f} ms median  {max(latencies):8.2f} ms max"
+    )
+
+
+def bench(url, years, classes_per_team, players):
+    engine = create_engine(url, future=True, **engine_options(url))
+    if url.startswith("sqlite"):
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+    seed(engine, years, classes_per_team, players)
+    counter = QueryCounter(engine)
+
+    print(f"Leaderboard over {years} years ({FIRST_YEAR}-{FIRST_YEAR + years - 1}):")
+    measure(engine, counter, "per-team counts", per_team_counts, years)
+    measure(engine, counter, "build_leaderboard", build_leaderboard, years)
+    measure(engine, counter, "read (cold)", read_leaderboard, years)  # first read writes the snapshot
+    measure(engine, counter, "read (snapshot)", read_leaderboard, years)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the rerank leaderboard against seeded data")
+    parser.add_argument("--years", type=int, default=25)
+    parser.add_argument("--classes-per-team", type=int, default=2)
+    parser.add_argument("--players", type=int, default=20)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+    if args.years < 1 or args.classes_per_team < 1 or args.players < 1:
+        parser.error("--years, --classes-per-team and --players must be positive")
+
+    if args.database_url:
+        bench(args.database_url, args.years, args.classes_per_team, args.players)
+        sys.exit(0)
+    tmp_dir = tempfile.mkdtemp(prefix="leaderboard-bench-")
+    try:
+        bench(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}", args.years, args.classes_per_team, args.players)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
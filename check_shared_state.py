@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Conformance check for the shared-state backends behind SHARED_STATE_URL.
+
+Usage:
+    python check_shared_state.py                    # MemoryState + RedisState against a local fake server
+    python check_shared_state.py redis://host:6379  # ... against a real server instead
+
+The fake server needs the ``fakeredis`` package (pip install -r requirements-dev.txt); it is
+started in-process on a free localhost port. Keys are written under a throwaway
+prefix and deleted again, so a real server can be used safely.
+"""
+import socket
+import sys
+import threading
+import time
+import uuid
+
+from app.services.cache import VersionRegistry
+from app.services.shared_state import MemoryState, RedisState
+
+PUBSUB_TIMEOUT = 5.0
+
+
+def start_fake_server() -> str:
+    from fakeredis import TcpFakeServer
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = TcpFakeServer(("127.0.0.1", port), server_type="redis")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"redis://127.0.0.1:{port}/0"
+
+
+def wait_for(predicate, timeout: float = PUBSUB_TIMEOUT) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+def check_state(name: str, state, peer=None) -> bool:
+    """Exercise the backend API; ``peer`` is a second client of the same store, if any."""
+    failures = []
+
+    def expect(label, ok):
+        if not ok:
+            failures.append(label)
+
+    peer = peer or state
+    state.set("k", "v")
+    expect("get after set", state.get("k") == "v")
+    expect("visible to peer", peer.get("k") == "v")
+    state.delete("k")
+    expect("get after delete", state.get("k") is None)
+
+    state.set("ttl", "v", ttl=0.2)
+    expect("ttl value", state.get("ttl") == "v")
+    expect("ttl expiry", wait_for(lambda: state.get("ttl") is None, timeout=2.0))
+
+    expect("set_if_absent on new key", state.set_if_absent("lock", "a", ttl=5))
+    expect("set_if_absent on held key", not peer.set_if_absent("lock", "b", ttl=5))
+    expect("set_if_absent keeps value", state.get("lock") == "a")
+    state.delete("lock")
+
+    expect("incr from missing", state.incr("n") == 1)
+    expect("incr from peer", peer.incr("n", 5) == 6)
+    expect("incr stored as text", state.get("n") == "6")
+    state.delete("n")
+
+    received = []
+    peer.subscribe("channel", received.append)
+    time.sleep(0.2)  # let a background subscriber register before publishing
+    state.publish("channel", "hello")
+    expect("pub/sub delivery", wait_for(lambda: received == ["hello"]))
+
+    ours, theirs = VersionRegistry(state), VersionRegistry(peer)
+    before = theirs.get("leaderboard", 2024)
+    ours.bump("leaderboard", 2024)
+    expect("version bump seen by peer", theirs.get("leaderboard", 2024) == before + 1)
+    expect("unrelated scope untouched", theirs.get("leaderboard", 2023) == 0)
+
+    for label in failures:
+        print(f"❌ {name}: {label}")
+    if not failures:
+        print(f"✅ {name}: get/set/ttl/set_if_absent/incr/delete/pub-sub/versions")
+    return not failures
+
+
+def main() -> bool:
+    ok = check_state("MemoryState", MemoryState())
+
+    if len(sys.argv) > 1:
+        url = sys.argv[1]
+    else:
+        try:
+            url = start_fake_server()
+        except ImportError:
+            print("❌ RedisState: fakeredis is not installed; pass a redis:// URL or pip install -r requirements-dev.txt")
+            return False
+    prefix = f"sbe-check-{uuid.uuid4().hex[:8]}:"
+    try:
+        state, peer = RedisState(url, prefix=prefix), RedisState(url, prefix=prefix)
+    except RuntimeError as e:
+        print(f"❌ RedisState: {e}")
+        return False
+    try:
+        ok = check_state(f"RedisState ({url})", state, peer) and ok
+    finally:
+        for key in state._client.scan_iter(prefix + "*"):
+            state._client.delete(key)
+        peer.close()
+        state.close()
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Convert app/data/rerank/{year}_{slug}.json files into the packed per-year archive.
+
+Usage:
+    python convert_rerank_archive.py [--data-dir DIR] [--remove-json] [--compact] [--bench]
+
+--remove-json  delete each JSON file once its class is in the archive
+--compact      rewrite every year's archive keeping only the live record per class
+--bench        compare read latency and disk footprint of both layouts (run before --remove-json)
+
+Run the conversion while the server is not writing reranks: a class saved between the
+archive check and the append would be overwritten by its older JSON file. --compact is
+safe alongside a running server; it holds each year's write lock while it rewrites.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+from app.services.rerank_archive import RerankArchive, DATA_EXT, INDEX_EXT
+from app.services.rerank import DATA_DIR
+
+JSON_NAME = re.compile(r"^(\d{4})_(.+)\.json$")
+
+
+def json_classes(data_dir):
+    for name in sorted(os.listdir(data_dir)):
+        match = JSON_NAME.match(name)
+        if match:
+            yield int(match.group(1)), match.group(2), os.path.join(data_dir, name)
+
+
+def convert(data_dir, remove_json=False):
+    archive = RerankArchive(data_dir)
+    converted = 0
+    for year, slug, path in json_classes(data_dir):
+        # The archive is authoritative once a class is in it; re-runs skip converted files
+        if archive.locate(year, slug) is None:
+            with open(path, "r", encoding="utf-8") as f:
+                players = json.load(f)
+            archive.append(year, slug, players)
+            converted += 1
+        if remove_json:
+            os.remove(path)
+    print(f"✅ Converted {converted} class file(s) into {len(archive.years())} year archive(s)")
+    return archive
+
+
+def disk_usage(paths):
+    """Bytes on disk (allocated blocks), which is what many small files cost."""
+    total = 0
+    for path in paths:
+        st = os.stat(path)
+        total += getattr(st, "st_blocks", 0) * 512 or st.st_size
+    return total
+
+
+def bench(data_dir, archive, reads=2000):
+    classes = [(year, slug, path) for year, slug, path in json_classes(data_dir)]
+    if not classes:
+        print("No JSON class files to benchmark against")
+        return
+    sample = [random.choice(classes) for _ in range(reads)]
+
+    started = time.perf_counter()
+    for _, _, path in sample:
+        with open(path, "r", encoding="utf-8") as f:
+            json.load(f)
+    json_us = (time.perf_counter() - started) / reads * 1e6
+
+    reader = RerankArchive(data_dir)
+    started = time.perf_counter()
+    for year, slug, _ in sample:
+        reader.read(year, slug)
+    archive_us = (time.perf_counter() - started) / reads * 1e6
+
+    json_files = [path for _, _, path in classes]
+    archive_files = [
+        os.path.join(data_dir, f"{year}{ext}") for year in archive.years() for ext in (DATA_EXT, INDEX_EXT)
+    ]
+    print(f"Read latency over {reads} random reads:")
+    print(f"  JSON files: {json_us:8.1f} µs/class")
+    print(f"  archive:    {archive_us:8.1f} µs/class")
+    print("Disk footprint:")
+    print(f"  JSON files: {len(json_files):6} files, {disk_usage(json_files):10} bytes")
+    print(f"  archive:    {len(archive_files):6} files, {disk_usage(archive_files):10} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert rerank JSON files into the packed archive")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--remove-json", action="store_true")
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--bench", action="store_true")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.data_dir):
+        print(f"Data directory {args.data_dir} not found")
+        sys.exit(1)
+    archive = convert(args.data_dir, remove_json=args.remove_json and not args.bench)
+    if args.compact:
+        for year in archive.years():
+            kept = archive.compact(year)
+            print(f"✅ Compacted {year}: {kept} class(es)")
+    if args.bench:
+        bench(args.data_dir, archive)
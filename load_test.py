@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Mixed read/write load test against a running API server.
+
+Usage:
+    python load_test.py [BASE_URL] [--requests N] [--concurrency C] [--write-ratio R] [--year Y]
+    python load_test.py [BASE_URL] --subscribers N [--messages M] [--year Y]
+    python load_test.py [BASE_URL] --login-storm N [--concurrency C] [--year Y]
+
+Run it once against the default sync setup and once with
+DATABASE_URL=sqlite+aiosqlite:///./app.db to compare concurrent latency.
+
+--subscribers holds N idle SSE connections on one team's message board, then posts M
+messages and reports how long fan-out to every subscriber takes. Raise the open-file
+limit (ulimit -n) on both ends for large N.
+
+--login-storm fires N logins with C concurrent clients while another client keeps
+reading the leaderboard, and reports that reader's latency next to a quiet baseline.
+Logins are bcrypt-bound, so this shows whether hashing stalls unrelated endpoints.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from urllib.parse import quote, urlsplit
+
+TEAMS = ["Alabama", "Georgia", "Ohio State", "Texas", "LSU", "Oregon", "Clemson", "Michigan"]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def make_request(session, base_url, year, write_ratio, i):
+    team = random.choice(TEAMS)
+    started = time.perf_counter()
+    try:
+        kind, status = send(session, base_url, year, write_ratio, team, i)
+    except requests.RequestException:
+        kind, status = "error", 599
+    return kind, status, (time.perf_counter() - started) * 1000
+
+
+def send(session, base_url, year, write_ratio, team, i):
+    if random.random() < write_ratio:
+        kind = "write"
+        resp = session.post(f"{base_url}/api/recruits/upload", json={
+            "year": year,
+            "team": team,
+            "recruits": [{"name": f"Load Test {i}-{n}", "stars": 3, "rank": n} for n in range(10)],
+        })
+    elif i % 2:
+        kind = "read"
+        resp = session.get(f"{base_url}/api/leaderboard/rerank/{year}")
+    else:
+        kind = "read"
+        resp = session.get(f"{base_url}/api/recruits/{year}/{team}")
+    return kind, resp.status_code
+
+
+def run_load_test(base_url, total, concurrency, write_ratio, year):
+    print(f"Load testing {base_url}: {total} requests, concurrency {concurrency}, write ratio {write_ratio}")
+    sessions = [requests.Session() for _ in range(concurrency)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(
+            lambda i: make_request(sessions[i % concurrency], base_url, year, write_ratio, i),
+            range(total),
+        ))
+    elapsed = time.perf_counter() - started
+
+    errors = sum(1 for _, status, _ in results if status >= 400)
+    print(f"Completed in {elapsed:.2f}s ({total / elapsed:.1f} req/s), {errors} errors")
+    for kind in ("read", "write"):
+        latencies = [ms for k, _, ms in results if k == kind]
+        if not latencies:
+            continue
+        print(
+            f"  {kind:5} n={len(latencies):5}  mean={statistics.mean(latencies):7.1f}ms  "
+            f"p50={percentile(latencies, 50):7.1f}ms  p95={percentile(latencies, 95):7.1f}ms  "
+            f"p99={percentile(latencies, 99):7.1f}ms"
+        )
+
+
+async def open_subscriber(host, port, path, ready):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode())
+    await writer.drain()
+    await reader.readuntil(b"\r\n\r\n")
+    ready.append(1)
+    return reader, writer
+
+
+async def wait_for_event(reader, kind):
+    marker = f"event: {kind}".encode()
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("stream closed")
+        if line.startswith(marker):
+            return time.perf_counter()
+
+
+async def run_subscriber_test(base_url, subscribers, messages, year):
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    team = "Load Test"
+    path = f"/api/messages/{year}/{quote(team)}/stream"
+    print(f"Opening {subscribers} SSE subscribers on {base_url}{path}")
+    ready = []
+    started = time.perf_counter()
+    conns = await asyncio.gather(*(open_subscriber(host, port, path, ready) for _ in range(subscribers)))
+    print(f"  {len(ready)} subscribers connected in {time.perf_counter() - started:.2f}s")
+    await asyncio.sleep(1)
+
+    session = requests.Session()
+    fanout = []
+    for i in range(messages):
+        waiters = [asyncio.ensure_future(wait_for_event(reader, "created")) for reader, _ in conns]
+        sent = time.perf_counter()
+        await asyncio.get_running_loop().run_in_executor(
+            None, lambda: session.post(f"{base_url}/api/messages/{year}/{team}", json={"content": f"load test {i}"})
+        )
+        arrivals = await asyncio.gather(*waiters)
+        fanout.append([(t - sent) * 1000 for t in arrivals])
+    for i, latencies in enumerate(fanout):
+        print(
+            f"  message {i}: delivered to {len(latencies)} subscribers, "
+            f"p50={percentile(latencies, 50):7.1f}ms  p95={percentile(latencies, 95):7.1f}ms  "
+            f"max={max(latencies):7.1f}ms"
+        )
+    for _, writer in conns:
+        writer.close()
+
+
+def read_latencies(session, base_url, year, stop, samples):
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            session.get(f"{base_url}/api/leaderboard/rerank/{year}")
+        except requests.RequestException:
+            continue
+        samples.append((time.perf_counter() - started) * 1000)
+
+
+def report(label, latencies):
+    print(
+        f"  {label:14} n={len(latencies):5}  p50={percentile(latencies, 50):7.1f}ms  "
+        f"p95={percentile(latencies, 95):7.1f}ms  p99={percentile(latencies, 99):7.1f}ms"
+    )
+
+
+def run_login_storm(base_url, logins, concurrency, year):
+    email, password = f"load-test-{int(time.time())}@example.com", "load-test-password"
+    requests.post(f"{base_url}/api/auth/register", json={"email": email, "password": password}).raise_for_status()
+    print(f"Login storm against {base_url}: {logins} logins, concurrency {concurrency}")
+
+    stop = threading.Event()
+    baseline = []
+    reader = threading.Thread(target=read_latencies, args=(requests.Session(), base_url, year, stop, baseline))
+    reader.start()
+    time.sleep(2)
+    stop.set()
+    reader.join()
+
+    stop.clear()
+    during = []
+    reader = threading.Thread(target=read_latencies, args=(requests.Session(), base_url, year, stop, during))
+    reader.start()
+    sessions = [requests.Session() for _ in range(concurrency)]
+
+    def login(i):
+        started = time.perf_counter()
+        try:
+            status = sessions[i % concurrency].post(
+                f"{base_url}/api/auth/login", json={"email": email, "password": password}
+            ).status_code
+        except requests.RequestException:
+            status = 599
+        return status, (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    reader.join()
+
+    busy = sum(1 for status, _ in results if status == 503)
+    errors = sum(1 for status, _ in results if status >= 400 and status != 503)
+    print(f"Logins completed in {elapsed:.2f}s ({logins / elapsed:.1f}/s), {busy} busy (503), {errors} errors")
+    report("login", [ms for status, ms in results if status == 200])
+    report("read (quiet)", baseline)
+    report("read (storm)", during)
+    stats = requests.get(f"{base_url}/api/cache/stats").json().get("password_hashing")
+    if stats:
+        print(f"  pool: {stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mixed read/write load test")
+    parser.add_argument("base_url", nargs="?", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--year", type=int, default=2099)
+    parser.add_argument("--subscribers", type=int, default=0)
+    parser.add_argument("--messages", type=int, default=5)
+    parser.add_argument("--login-storm", type=int, default=0)
+    args = parser.parse_args()
+    if args.login_storm:
+        run_login_storm(args.base_url.rstrip("/"), args.login_storm, args.concurrency, args.year)
+    elif args.subscribers:
+        asyncio.run(run_subscriber_test(args.base_url.rstrip("/"), args.subscribers, args.messages, args.year))
+    else:
+        run_load_test(args.base_url.rstrip("/"), args.requests, args.concurrency, args.write_ratio, args.year)
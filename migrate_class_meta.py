@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Migration script for the numeric recruits.rating column and ClassMeta running aggregates.
+
+Usage:
+    python migrate_class_meta.py          # add columns + rating index, backfill ratings, rebuild aggregates
+    python migrate_class_meta.py --check  # report ClassMeta rows whose aggregates drifted; writes nothing
+
+Uses DATABASE_URL like the app. Safe to re-run: ratings are only backfilled where
+missing and the aggregates are recomputed from the recruits table every time. Notes
+rating a player 0 (unrated) leave the column NULL, as new imports do. Once a CFBD
+recruit's rating is in the column, its generated ``rating:<value>`` note is cleared.
+
+Run it after migrate_player_count.py and before migrate_indexes.py, which cannot create
+the recruits.rating index until this script has added the column.
+"""
+import sys
+
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import engine
+from app.services.bulk import update_recruits
+from app.services.class_meta import rating_from_note, rebuild
+
+NEW_COLUMNS = {
+    "recruits": {"rating": "FLOAT"},
+    "class_meta": {
+        "stars_sum": "INTEGER DEFAULT 0",
+        "stars_count": "INTEGER DEFAULT 0",
+        "rating_sum": "FLOAT DEFAULT 0",
+        "rating_count": "INTEGER DEFAULT 0",
+    },
+}
+RATING_INDEX = next(ix for ix in models.Recruit.__table__.indexes if ix.name == "ix_recruits_year_rating")
+BATCH_SIZE = 1000
+
+
+def add_columns():
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table, columns in NEW_COLUMNS.items():
+            existing = {column["name"] for column in inspector.get_columns(table)}
+            for name, ddl in columns.items():
+                if name in existing:
+                    print(f"✅ {table}.{name} already exists")
+                    continue
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+                print(f"✅ {table}.{name} added")
+    engine.dispose()  # pooled connections may have cached the old schema
+    existing = {ix["name"] for ix in inspect(engine).get_indexes("recruits")}
+    if RATING_INDEX.name not in existing:
+        RATING_INDEX.create(bind=engine)
+        print(f"✅ index {RATING_INDEX.name} created")
+
+
+def backfill_ratings(db: Session) -> int:
+    """Copy legacy ``rating:<value>`` notes into recruits.rating where it is still empty.
+
+    The old import wrote ``rating:0.0`` for unrated players; like new imports, those stay NULL.
+    """
+    filled = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.query(models.Recruit.id, models.Recruit.note)
+            .filter(models.Recruit.id > last_id, models.Recruit.rating.is_(None), models.Recruit.note.like("%rating:%"))
+            .order_by(models.Recruit.id)
+            .limit(BATCH_SIZE)
+            .all()
+        )
+        if not rows:
+            return filled
+        last_id = rows[-1].id
+        updates = [{"id": rid, "rating": rating} for rid, note in rows if (rating := rating_from_note(note) or 0) > 0]
+        filled += update_recruits(db, updates)
+        db.commit()
+
+
+def clear_rating_notes(db: Session) -> int:
+    """Drop the generated note from CFBD recruits whose note value is the stored rating."""
+    cleared = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.query(models.Recruit.id, models.Recruit.note, models.Recruit.rating)
+            .filter(
+                models.Recruit.id > last_id,
+                models.Recruit.source == "cfbd",
+                models.Recruit.rating.isnot(None),
+                models.Recruit.note.like("rating:%"),
+            )
+            .order_by(models.Recruit.id)
+            .limit(BATCH_SIZE)
+            .all()
+        )
+        if not rows:
+            return cleared
+        last_id = rows[-1].id
+        updates = [{"id": rid, "note": ""} for rid, note, rating in rows if rating_from_note(note) == rating]
+        cleared += update_recruits(db, updates)
+        db.commit()
+
+
+def migrate_class_meta():
+    add_columns()
+    with Session(engine) as db:
+        print("Backfilling recruits.rating from notes...")
+        print(f"✅ {backfill_ratings(db)} rating(s) backfilled")
+        print(f"✅ {clear_rating_notes(db)} generated rating note(s) cleared")
+        print("Rebuilding ClassMeta aggregates...")
+        drifted = rebuild(db)
+        db.commit()
+        print(f"✅ aggregates rebuilt ({len(drifted)} class(es) changed)")
+
+
+def missing_columns():
+    inspector = inspect(engine)
+    return [
+        f"{table}.{name}"
+        for table, columns in NEW_COLUMNS.items()
+        for name in set(columns) - {column["name"] for column in inspector.get_columns(table)}
+    ]
+
+
+def check() -> bool:
+    missing = missing_columns()
+    if missing:
+        print(f"Missing column(s) {', '.join(sorted(missing))}: run python migrate_class_meta.py first")
+        return False
+    with Session(engine) as db:
+        drifted = rebuild(db)
+        db.rollback()
+    for year, team in drifted:
+        print(f"DRIFT {year} {team}")
+    print(f"{len(drifted)} class(es) with stale aggregates" if drifted else "✅ ClassMeta aggregates are consistent")
+    return not drifted
+
+
+if __name__ == "__main__":
+    if "--check" in sys.argv[1:]:
+        sys.exit(0 if check() else 1)
+    migrate_class_meta()
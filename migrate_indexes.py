@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the composite indexes behind the hot (year, team) lookups.
+
+Usage:
+    python migrate_indexes.py          # create any missing tables/indexes
+    python migrate_indexes.py --check  # also fail if a hot query plans a full table scan
+
+Uses DATABASE_URL like the app, so it works against SQLite and Postgres alike.
+
+On an existing database run the column migrations first, in this order:
+    python migrate_admin_field.py
+    python migrate_player_count.py
+    python migrate_class_meta.py
+    python migrate_indexes.py --check
+An index whose columns are not there yet is skipped with a pointer to the script that
+adds them, and --check then fails until it has been created.
+"""
+import re
+import sys
+from datetime import datetime
+
+from sqlalchemy import inspect, select, text
+
+from app import models
+from app.db import engine, Base
+from app.services.leaderboard import latest_classes_query, snapshot_query, team_ratings_query, team_history_query
+from app.services.pagination import ordered
+from app.services.queries import (
+    RECRUIT_ORDER, RATING_ORDER, MESSAGE_ORDER, CLASS_ORDER,
+    class_recruits_query, rated_recruits_query, delete_class_recruits, class_meta_query,
+    team_classes_query, class_players_query, delete_class_players, team_messages_query,
+)
+
+YEAR, TEAM = 2020, "Texas"
+
+# Every query the request handlers run on a filtered path, built by the same functions
+HOT_QUERIES = {
+    "recruits by class": ordered(class_recruits_query(YEAR, TEAM), RECRUIT_ORDER),
+    "recruit replace": delete_class_recruits(YEAR, TEAM),
+    "class meta": class_meta_query(YEAR, TEAM),
+    "latest user class": team_classes_query(YEAR, TEAM, user_created=True),
+    "latest class": team_classes_query(YEAR, TEAM),
+    "leaderboard classes": latest_classes_query(YEAR),
+    "class players": class_players_query(1),
+    "class players replace": delete_class_players(1),
+    "team messages": ordered(team_messages_query(YEAR, TEAM), MESSAGE_ORDER),
+    "message page": ordered(select(models.Message), MESSAGE_ORDER, [datetime(2020, 1, 1), 1]),
+    "team message page": ordered(team_messages_query(YEAR, TEAM), MESSAGE_ORDER, [datetime(2020, 1, 1), 1]),
+    "class page": ordered(select(models.RerankClass), CLASS_ORDER, [YEAR, 1]),
+    "recruit page": ordered(class_recruits_query(YEAR, TEAM), RECRUIT_ORDER, [10, 1]),
+    "top rated recruits": ordered(rated_recruits_query(YEAR), RATING_ORDER, [0.9, 1]),
+    "team top rated recruits": ordered(rated_recruits_query(YEAR, TEAM), RATING_ORDER, [0.9, 1]),
+    "team ratings": team_ratings_query(YEAR),
+    "team history": team_history_query(TEAM),
+    "leaderboard snapshot": snapshot_query(YEAR),
+}
+
+# Columns added to existing tables by a separate migration script
+COLUMN_MIGRATIONS = {
+    ("users", "is_admin"): "migrate_admin_field.py",
+    ("rerank_classes", "player_count"): "migrate_player_count.py",
+    ("recruits", "rating"): "migrate_class_meta.py",
+}
+
+FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: LEFT-JOIN)?$")
+
+
+def migrate_indexes() -> list:
+    """Create missing tables, then any model index the database does not have yet.
+
+    Returns the names of indexes skipped because a column they cover does not exist yet.
+    """
+    Base.metadata.create_all(bind=engine)
+    inspector = inspect(engine)
+    created = 0
+    skipped = []
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                missing = [column.name for column in index.columns if column.name not in columns]
+                if missing:
+                    scripts = sorted({COLUMN_MIGRATIONS.get((table.name, name), "its column migration") for name in missing})
+                    print(
+                        f"❌ Skipping index {index.name}: {table.name}.{', '.join(missing)} does not exist yet "
+                        f"(run python {' and '.join(scripts)} first)"
+                    )
+                    skipped.append(index.name)
+                    continue
+                print(f"Creating index {index.name} on {table.name}...")
+                index.create(bind=conn)
+                created += 1
+    print(f"✅ {created} index(es) created" if created else "✅ All indexes already exist")
+    return skipped
+
+
+def check_query_plans() -> bool:
+    """EXPLAIN QUERY PLAN each hot query; returns False if any falls back to a full scan."""
+    if engine.dialect.name != "sqlite":
+        print(f"Skipping query plan check on {engine.dialect.name}")
+        return True
+    tables = set(Base.metadata.tables)
+    ok = True
+    # Pooled connections may still hold the schema from before migrate_indexes()
+    engine.dispose()
+    with engine.connect() as conn:
+        for name, stmt in HOT_QUERIES.items():
+            sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+            plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+            scans = [m.group(1) for m in map(FULL_SCAN.match, plan) if m and m.group(1) in tables]
+            if scans:
+                ok = False
+                print(f"❌ {name}: full scan of {', '.join(scans)}")
+                for detail in plan:
+                    print(f"     {detail}")
+            else:
+                print(f"✅ {name}: {'; '.join(plan)}")
+    return ok
+
+
+if __name__ == "__main__":
+    skipped = migrate_indexes()
+    if "--check" in sys.argv[1:]:
+        if skipped:
+            # Hot queries reference the missing columns, so their plans cannot be checked yet
+            print(f"❌ {len(skipped)} index(es) not created; query plans not checked")
+            sys.exit(1)
+        if not check_query_plans():
+            sys.exit(1)
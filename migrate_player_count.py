@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Migration script to add rerank_classes.player_count and backfill it from rerank_players.
+
+Uses DATABASE_URL like the app. Safe to re-run: the backfill recounts every class.
+"""
+from sqlalchemy import inspect, text
+
+from app.db import engine
+
+
+def migrate_player_count():
+    columns = [column["name"] for column in inspect(engine).get_columns("rerank_classes")]
+    with engine.begin() as conn:
+        if "player_count" not in columns:
+            print("Adding player_count column to rerank_classes table...")
+            conn.execute(text("ALTER TABLE rerank_classes ADD COLUMN player_count INTEGER DEFAULT 0"))
+            print("✅ player_count column added successfully")
+        else:
+            print("✅ player_count column already exists")
+
+        print("Backfilling player_count from rerank_players...")
+        result = conn.execute(text(
+            "UPDATE rerank_classes SET player_count = "
+            "(SELECT COUNT(*) FROM rerank_players WHERE rerank_players.class_id = rerank_classes.id)"
+        ))
+        print(f"✅ {result.rowcount} class(es) backfilled")
+
+
+if __name__ == "__main__":
+    migrate_player_count()
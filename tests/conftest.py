@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# The engine and caches are built at import time: point them at throwaway files before
+# any test imports the app, so the suite never touches ./app.db or ./cfbd_cache.db.
+_tmp = tempfile.mkdtemp(prefix="sbe-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp, 'app.db')}")
+os.environ.setdefault("CFBD_CACHE_PATH", os.path.join(_tmp, "cfbd_cache.db"))
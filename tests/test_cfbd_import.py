@@ -0,0 +1,144 @@
+import hashlib
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.db import Base
+from app.services.cfbd import CFBDClient, TokenBucket, bulk_import_year
+from app.services.http_cache import HTTPCache
+
+PAST_YEAR = 2015
+
+TEAMS = [
+    {"team": "Texas", "rank": 1, "points": 300.0},
+    {"team": "Oklahoma", "rank": 2, "points": 280.0},
+    {"team": "Baylor", "rank": 3, "points": 250.0},
+]
+
+
+def player(name, team, rating):
+    return {"name": name, "committedTo": team, "rating": rating, "stars": 4, "ranking": 0}
+
+
+def etag_of(body):
+    return '"%s"' % hashlib.sha1(json.dumps(body).encode("utf-8")).hexdigest()
+
+
+class StubCFBD(BaseHTTPRequestHandler):
+    """Serves canned /recruiting payloads with ETags and records every request."""
+
+    routes = {}
+    requests = []
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = tuple(sorted(parse_qsl(url.query)))
+        body = self.routes.get((url.path, params))
+        etag = etag_of(body)
+        status = 404 if body is None else 304 if self.headers.get("If-None-Match") == etag else 200
+        self.requests.append((url.path, dict(params), status))
+        if status == 404:
+            self.send_response(404)
+            self.end_headers()
+            return
+        if status == 304:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    StubCFBD.routes = {}
+    StubCFBD.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubCFBD)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("CFBD_BASE_URL", f"http://127.0.0.1:{server.server_port}")
+    yield StubCFBD
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cfbd.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def make_client(cache):
+    return CFBDClient("test-key", limiter=TokenBucket(rate=0, capacity=1), cache=cache, offline=False)
+
+
+def route(stub, path, body, **params):
+    stub.routes[(path, tuple(sorted((k, str(v)) for k, v in params.items())))] = body
+
+
+def test_stale_entry_is_revalidated_with_etag(stub, tmp_path):
+    year = datetime.utcnow().year  # current cycle: entries go stale after the TTL
+    route(stub, "/recruiting/teams", TEAMS, year=year)
+    client = make_client(HTTPCache(str(tmp_path / "http.db"), current_cycle_ttl=0))
+
+    first = client.recruiting_teams(year)
+    second = client.recruiting_teams(year)
+
+    assert first == second == TEAMS
+    assert [status for _, _, status in stub.requests] == [200, 304]
+
+
+def test_past_year_reimport_makes_no_requests(stub, tmp_path, session_factory):
+    route(stub, "/recruiting/teams", TEAMS, year=PAST_YEAR)
+    route(stub, "/recruiting/players", [
+        player("A", "Texas", 0.95), player("B", "Oklahoma", 0.9), player("C", "Baylor", 0.85),
+    ], year=PAST_YEAR)
+    client = make_client(HTTPCache(str(tmp_path / "http.db")))
+
+    first = bulk_import_year(PAST_YEAR, client, session_factory)
+    requests_made = len(stub.requests)
+    second = bulk_import_year(PAST_YEAR, client, session_factory)
+
+    assert first["imported"] == second["imported"] == 3
+    assert requests_made == 2
+    assert len(stub.requests) == requests_made
+
+
+def test_missing_teams_fall_back_to_per_team_requests(stub, tmp_path, session_factory):
+    route(stub, "/recruiting/teams", TEAMS, year=PAST_YEAR)
+    route(stub, "/recruiting/players", [player("A", "Texas", 0.95)], year=PAST_YEAR)
+    route(stub, "/recruiting/players", [player("B", "Oklahoma", 0.9)], year=PAST_YEAR, team="Oklahoma")
+    route(stub, "/recruiting/players", [], year=PAST_YEAR, team="Baylor")
+    with session_factory() as db:
+        db.add(models.Recruit(year=PAST_YEAR, team="Baylor", name="Kept", source="manual"))
+        db.commit()
+    client = make_client(HTTPCache(str(tmp_path / "http.db")))
+
+    result = bulk_import_year(PAST_YEAR, client, session_factory)
+
+    assert result["imported"] == 2
+    assert result["missing"] == ["Baylor"]
+    assert result["errors"] == {}
+    per_team = sorted(params["team"] for path, params, _ in stub.requests if "team" in params)
+    assert per_team == ["Baylor", "Oklahoma"]
+    with session_factory() as db:
+        names = {r.team: r.name for r in db.query(models.Recruit)}
+    assert names == {"Texas": "A", "Oklahoma": "B", "Baylor": "Kept"}
@@ -0,0 +1,63 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+YEAR, TEAM = 2019, "Texas"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def upload(client, points):
+    recruits = [{"name": "A", "stars": 4, "rank": 1, "outcome": "College Starter", "points": points}]
+    r = client.post("/api/recruits/upload", json={"year": YEAR, "team": TEAM, "recruits": recruits})
+    assert r.status_code == 200, r.text
+
+
+def revalidate(client, url, etag):
+    return client.get(url, headers={"If-None-Match": etag})
+
+
+def test_recruits_304_until_upload(client):
+    upload(client, 2)
+    url = f"/api/recruits/{YEAR}/{TEAM}"
+    first = client.get(url)
+    etag = first.headers["ETag"]
+    assert revalidate(client, url, etag).status_code == 304
+
+    upload(client, 3)
+    fresh = revalidate(client, url, etag)
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    assert fresh.json()[0]["points"] == 3
+
+
+def test_leaderboard_304_until_rerank_write(client):
+    url = f"/api/leaderboard/rerank/{YEAR}"
+    etag = client.get(url).headers["ETag"]
+    assert revalidate(client, url, etag).status_code == 304
+    assert revalidate(client, url, f'W/{etag}').status_code == 304
+
+    upload(client, 4)
+    assert client.post(f"/api/recruits/recalc/{YEAR}/{TEAM}").status_code == 200
+    fresh = revalidate(client, url, etag)
+    assert fresh.status_code == 200
+    row = next(r for r in fresh.json()["rows"] if r["team"] == TEAM)
+    assert row["total_points"] == 4
+
+
+def test_rerank_class_304(client):
+    url = "/api/rerank/2002/Oklahoma State"
+    first = client.get(url)
+    assert first.status_code == 200
+    assert revalidate(client, url, first.headers["ETag"]).status_code == 304
+    assert revalidate(client, url, '"stale"').status_code == 200
+
+
+def test_missing_rerank_class_is_404_not_304(client):
+    url = "/api/rerank/1990/Nowhere State"
+    assert revalidate(client, url, "*").status_code == 404
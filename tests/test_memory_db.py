@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SMOKE = """
+from fastapi.testclient import TestClient
+from app.main import app
+
+with TestClient(app) as client:
+    for _ in range(3):
+        r = client.get("/api/leaderboard/rerank/2021")
+        assert r.status_code == 200, r.text
+"""
+
+
+@pytest.mark.parametrize("url", ["sqlite://", "sqlite+aiosqlite://"])
+def test_app_boots_on_in_memory_sqlite(url):
+    # the engine is built at import time, so each URL needs its own interpreter
+    env = dict(os.environ, DATABASE_URL=url)
+    result = subprocess.run([sys.executable, "-c", SMOKE], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,69 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.pagination import decode_cursor, encode_cursor
+
+YEAR = 2018
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        recruits = [{"name": f"P{i}", "rank": i % 3, "rating": 0.9 if i < 5 else 0.8} for i in range(8)]
+        r = client.post("/api/recruits/upload", json={"year": YEAR, "team": "Texas", "recruits": recruits})
+        assert r.status_code == 200, r.text
+        yield client
+
+
+def pages(client, url, limit):
+    rows, cursor = [], None
+    while True:
+        r = client.get(url, params={"limit": limit, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200, r.text
+        rows.extend(r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            return rows
+
+
+def test_cursor_round_trip():
+    values = [datetime(2021, 5, 1, 12, 30, 15, 250), 42, 0.875, "Texas A&M", None]
+    assert decode_cursor(encode_cursor(values), len(values)) == values
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-base64!",
+    encode_cursor([1]),
+    encode_cursor([[1], 2]),
+    encode_cursor([{"dt": "x"}, 1]),
+    encode_cursor([{"dt": 5}, 1]),
+    encode_cursor([{"when": "2021-05-01"}, 1]),
+])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 2)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_equal_ratings_page_without_gaps_or_repeats(client, limit):
+    rows = pages(client, f"/api/leaderboard/recruits/{YEAR}", limit)
+    assert len(rows) == 8
+    assert len({r["id"] for r in rows}) == 8
+    assert [r["rating"] for r in rows] == [0.9] * 5 + [0.8] * 3
+    # ties on rating fall back to id, descending
+    assert [r["id"] for r in rows[:5]] == sorted((r["id"] for r in rows[:5]), reverse=True)
+
+
+def test_equal_ranks_page_in_full_order(client):
+    unpaged = client.get(f"/api/recruits/{YEAR}/Texas").json()
+    assert [r["id"] for r in pages(client, f"/api/recruits/{YEAR}/Texas", 3)] == [r["id"] for r in unpaged]
+
+
+def test_malformed_cursor_is_400(client):
+    r = client.get(f"/api/leaderboard/recruits/{YEAR}", params={"cursor": encode_cursor(["high", 1, 2])})
+    assert r.status_code == 400
+    r = client.get(f"/api/recruits/{YEAR}/Texas", params={"cursor": "%%%"})
+    assert r.status_code == 400
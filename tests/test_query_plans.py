@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHECK = """
+import sys
+from sqlalchemy import text
+from app.db import engine
+from migrate_indexes import migrate_indexes, check_query_plans
+
+assert migrate_indexes() == []
+assert check_query_plans(), "a hot query plans a full table scan"
+if "--drop" in sys.argv:
+    with engine.begin() as conn:
+        names = conn.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'recruits' AND sql IS NOT NULL"
+        )).scalars().all()
+        for name in names:
+            conn.execute(text(f"DROP INDEX {name}"))
+    assert not check_query_plans(), "full scan of recruits not reported"
+"""
+
+
+def run_check(tmp_path, *args):
+    # the engine is built at import time, so the fresh database needs its own interpreter
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'plans.db'}")
+    return subprocess.run([sys.executable, "-c", CHECK, *args], cwd=ROOT, env=env, capture_output=True, text=True)
+
+
+def test_hot_queries_use_indexes(tmp_path):
+    result = run_check(tmp_path)
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+def test_missing_index_is_reported(tmp_path):
+    result = run_check(tmp_path, "--drop")
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,40 @@
+import threading
+
+from app.services.rerank_archive import RerankArchive
+
+YEAR = 2010
+
+
+def test_appends_during_compaction_are_kept(tmp_path):
+    # Two instances stand in for two workers sharing the data directory
+    writer, compactor = RerankArchive(str(tmp_path)), RerankArchive(str(tmp_path))
+    writer.append(YEAR, "seed", [{"name": "Seed", "points": 1, "note": ""}])
+    done = threading.Event()
+
+    def compact_until_done():
+        while not done.is_set():
+            compactor.compact(YEAR)
+
+    thread = threading.Thread(target=compact_until_done)
+    thread.start()
+    try:
+        for i in range(300):
+            writer.append(YEAR, f"team-{i}", [{"name": f"P{i}", "points": i, "note": ""}])
+    finally:
+        done.set()
+        thread.join()
+
+    fresh = RerankArchive(str(tmp_path))
+    assert len(fresh.slugs(YEAR)) == 301
+    assert fresh.read(YEAR, "team-299") == [{"name": "P299", "points": 299, "note": ""}]
+
+
+def test_compact_keeps_only_live_records(tmp_path):
+    archive = RerankArchive(str(tmp_path))
+    archive.append(YEAR, "texas", [{"name": "Old", "points": 1, "note": ""}])
+    archive.append(YEAR, "texas", [{"name": "New", "points": 2, "note": ""}])
+    archive.append(YEAR, "baylor", [{"name": "B", "points": 3, "note": ""}])
+
+    assert archive.compact(YEAR) == 2
+    assert archive.read(YEAR, "texas") == [{"name": "New", "points": 2, "note": ""}]
+    assert archive.read(YEAR, "baylor") == [{"name": "B", "points": 3, "note": ""}]
@@ -0,0 +1,21 @@
+from app import models
+from app.db import Base, SessionLocal, engine
+from app.services.leaderboard import team_history_query
+
+TEAM = "Baylor"
+
+
+def test_duplicate_class_meta_rows_are_not_mixed():
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.add(models.ClassMeta(year=2017, team=TEAM, national_rank=5, points=200.0, avg_rating=0.85, avg_stars=3.5, commits=20))
+        db.add(models.ClassMeta(year=2017, team=TEAM, national_rank=40, points=150.0, avg_rating=0.80, avg_stars=3.0, commits=18))
+        db.commit()
+        newest = max(cm.id for cm in db.query(models.ClassMeta).filter_by(year=2017, team=TEAM))
+
+        rows = db.execute(team_history_query(TEAM)).all()
+
+    assert len(rows) == 1
+    row = rows[0]
+    assert row.meta_id == newest
+    assert (row.national_rank, row.recruiting_points, row.avg_rating, row.signed) == (40, 150.0, 0.80, 18)
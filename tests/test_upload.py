@@ -0,0 +1,66 @@
+import asyncio
+
+from app.services import upload
+from app.services.upload import UploadError, iter_csv
+
+
+async def _chunks(data: bytes, size: int = 7):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def _parse(data: bytes):
+    async def collect():
+        return [item async for item in iter_csv(_chunks(data))]
+    return asyncio.run(collect())
+
+
+def test_stray_quote_in_unquoted_field():
+    data = (
+        b"year,team,name,position\n"
+        b"2021,Texas,A,6'2\" WR\n"
+        b"2021,Texas,B,QB\n"
+        b"2021,Texas,C,RB\n"
+    )
+    items = _parse(data)
+    assert [line for line, _ in items] == [2, 3, 4]
+    assert not any(isinstance(item, UploadError) for _, item in items)
+    assert items[0][1]["position"] == "6'2\" WR"
+
+
+def test_quoted_field_spans_lines():
+    data = b'year,team,name\n2021,Texas,"Smith,\nJr."\n2021,Texas,"Say ""hi"""\n'
+    items = _parse(data)
+    assert items == [
+        (2, {"year": "2021", "team": "Texas", "name": "Smith,\nJr."}),
+        (4, {"year": "2021", "team": "Texas", "name": 'Say "hi"'}),
+    ]
+
+
+def test_runaway_quoted_field_is_capped(monkeypatch):
+    monkeypatch.setattr(upload, "MAX_RECORD_CHARS", 50)
+    data = b'year,team,name\n2021,Texas,"open\n' + b"x" * 30 + b"\n" + b"y" * 30 + b"\n2021,Texas,D\n"
+    items = _parse(data)
+    assert isinstance(items[0][1], UploadError) and items[0][0] == 2
+    assert items[-1] == (5, {"year": "2021", "team": "Texas", "name": "D"})
+
+
+def test_oversized_line_without_newline_is_rejected(monkeypatch):
+    monkeypatch.setattr(upload, "MAX_RECORD_CHARS", 16)
+    data = b'{"year": 2021, "team": "Texas", "name": "A"}' + b"x" * 1000
+
+    async def collect():
+        return [item async for item in upload.iter_ndjson(_chunks(data, size=32))]
+
+    items = asyncio.run(collect())
+    assert len(items) == 1
+    line, error = items[0]
+    assert line == 1 and isinstance(error, UploadError)
+
+
+def test_parsing_resumes_after_oversized_line(monkeypatch):
+    monkeypatch.setattr(upload, "MAX_RECORD_CHARS", 16)
+    data = b"year,team,name\n2021,Texas," + b"x" * 200 + b"\n2021,Texas,B\n"
+    items = _parse(data)
+    assert isinstance(items[0][1], UploadError) and items[0][0] == 2
+    assert items[1] == (3, {"year": "2021", "team": "Texas", "name": "B"})